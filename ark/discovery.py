@@ -1,17 +1,20 @@
+import hashlib
+import os
 import shutil
-from collections import defaultdict
-from dataclasses import dataclass
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Dict, Generator, List, Set, Tuple
+from typing import Deque, Dict, Generator, Iterator, List, Optional, Set, Tuple
 
 import ue.hierarchy
 from ark.mod import get_managed_mods, get_official_mods
 from automate.ark import ArkSteamManager
 from config import get_global_config
-from ue.asset import ExportTableItem
-from ue.context import ue_parsing_context
-from ue.loader import AssetLoadException
-from utils.cachefile import cache_data
+from ue.assetcache import get_parser_version
+from ue.loader import AssetLoadException, load_asset_summary_from_file
+from utils.cachefile import cache_data, hash_from_object, load_cached_data, save_cached_data
 from utils.log import get_logger
 from utils.tree import IndexedTree
 
@@ -21,13 +24,31 @@ __all__ = [
 
 FORMAT_VERSION = 1
 
+# Number of assets handed to a worker process at a time during parallel discovery
+DISCOVERY_CHUNK_SIZE = 250
+
+FAILED_LOAD = 'Failed to load asset: %s'
+FAILED_PARENTAGE = 'Failed to check parentage of %s'
+
 logger = get_logger(__name__)
 
+# (assetname, file path, file extension)
+AssetFile = Tuple[str, str, str]
+
+# (fullname, parent fullname or None if it could not be found)
+ClassRelation = Tuple[str, Optional[str]]
+
+# (assetname, list of class relations or None on failure, warning message on failure)
+AssetRelations = Tuple[str, Optional[List[ClassRelation]], Optional[str]]
 
-@dataclass
-class NodeState:
-    parent: str
-    done: bool = False
+# (file extension, file size, file modification time in ns)
+FileStamp = Tuple[str, int, int]
+FileEntry = Tuple[FileStamp, AssetRelations]
+
+
+def _get_file_cache_key() -> dict:
+    # Include the parser's version so relations read by an older summary reader are not re-used
+    return dict(format=FORMAT_VERSION, kind='file-relations', parser=get_parser_version())
 
 
 def initialise_hierarchy(arkman: ArkSteamManager):
@@ -39,52 +60,72 @@ def initialise_hierarchy(arkman: ArkSteamManager):
         shutil.rmtree(path)
     path.mkdir(parents=True, exist_ok=True)
 
+    internal_hierarchies = [Path('config') / 'hierarchy.yaml']
+    app_hierarchy = Path('config') / f'hierarchy-{arkman.config.steamcmd.AppId}.yaml'
+    if app_hierarchy.exists():
+        internal_hierarchies.append(app_hierarchy)
+
+    # Use the snapshot of the complete hierarchy if none of its inputs have changed
+    snapshot_file = path / 'hierarchy.snapshot'
+    snapshot_key = _get_snapshot_key(arkman, internal_hierarchies)
+    if ue.hierarchy.load_snapshot(snapshot_file, snapshot_key):
+        logger.info('Hierarchy loaded from snapshot')
+        return
+
     # Gather cached relationships from core and mods, re-generating as needed
     relations = _gather_relations(arkman, path)
 
     # Parse the relationships into ue.hierarchy.tree
     ue.hierarchy.tree.clear()
-    ue.hierarchy.load_internal_hierarchy(Path('config') / 'hierarchy.yaml')
-    app_hierarchy = Path('config') / f'hierarchy-{arkman.config.steamcmd.AppId}.yaml'
-    if app_hierarchy.exists():
-        ue.hierarchy.load_internal_hierarchy(app_hierarchy)
+    for filename in internal_hierarchies:
+        ue.hierarchy.load_internal_hierarchy(filename)
     _populate_tree_from_relations(ue.hierarchy.tree, relations)
 
+    ue.hierarchy.save_snapshot(snapshot_file, snapshot_key)
+
     logger.info('Hierarchy reconstruction complete')
 
 
+def _get_snapshot_key(arkman: ArkSteamManager, internal_hierarchies: List[Path]) -> str:
+    key = dict(
+        format=FORMAT_VERSION,
+        core=_get_core_version_key(arkman),
+        mods=[(modid, _get_mod_version_key(arkman, modid)) for modid in get_managed_mods()],
+        internal=[hashlib.sha1(filename.read_bytes()).hexdigest() for filename in internal_hierarchies],
+    )
+    return hash_from_object(key)
+
+
+def _get_core_version_key(arkman: ArkSteamManager) -> dict:
+    inclusions = arkman.config.optimisation.SearchInclude
+    exclusions = arkman.config.optimisation.SearchIgnore
+    return dict(format=FORMAT_VERSION, game_buildid=arkman.getGameBuildId(), inclusions=inclusions, exclusions=exclusions)
+
+
+def _get_mod_version_key(arkman: ArkSteamManager, modid: str) -> dict:
+    inclusions = arkman.config.optimisation.SearchInclude
+    exclusions = arkman.config.optimisation.SearchIgnore
+    mod_version = arkman.getModData(modid)['version']  # type:ignore
+    return dict(format=FORMAT_VERSION, mod_version=mod_version, inclusions=inclusions, exclusions=exclusions)
+
+
 def _populate_tree_from_relations(tree: IndexedTree[str], relations: List[Tuple[str, str]]):
     # Convert inputs to a more useful form (a dict of tree segments for each parent)
     parents: Dict[str, Set[str]] = defaultdict(set)
     for name, parent in relations:
         parents[parent].add(name)
 
-    # Create a list of parents ordered by path length ('/' count) to improve insertion order
-    parent_order: List[NodeState] = [NodeState(key) for key in sorted(parents.keys(), key=lambda k: k.count('/'))]
-
-    # Continually try to insert each of our segments until all done
-    prev_not_done = -1
-    not_done = 99999999
-    while not_done and not_done != prev_not_done:
-        prev_not_done = not_done
-        not_done = 0
-        for state in parent_order:
-            if state.done:
-                continue
+    # Walk outwards from every parent that is already in the tree, placing each segment exactly once
+    queue: Deque[str] = deque(parent for parent in parents if parent in tree)
+    while queue:
+        parent = queue.popleft()
+        for name in parents.pop(parent, ()):
+            tree.add(parent, name)
+            if name in parents:
+                queue.append(name)
 
-            not_done += 1
-
-            parent = state.parent
-
-            # Can we insert this one yet?
-            if state.parent in tree:
-                for name in parents[parent]:
-                    tree.add(parent, name)
-                state.done = True
-    else:
-        # We hit stable state, but have entries remaining
-        leftovers = {state.parent: parents[state.parent] for state in parent_order if not state.done}
-        _process_leftover_relations(leftovers)
+    # Anything remaining is not connected to the tree
+    _process_leftover_relations(parents)
 
 
 def _process_leftover_relations(entries: Dict[str, Set[str]]):
@@ -101,38 +142,37 @@ def _process_leftover_relations(entries: Dict[str, Set[str]]):
                 f.write(f'  {name}\n')
 
     total = sum(len(names) for names in entries.values())
-    logger.warning(f"Could not place {total} entries from {len(entries)} parents (see {filename})")
+    if total:
+        logger.warning(f"Could not place {total} entries from {len(entries)} parents (see {filename})")
 
 
 def _gather_relations(arkman: ArkSteamManager, basepath: Path):
     relations: List[Tuple[str, str]]  # list of (name, parent)
-    inclusions = arkman.config.optimisation.SearchInclude
-    exclusions = arkman.config.optimisation.SearchIgnore
 
     basepath.mkdir(parents=True, exist_ok=True)
 
     # Scan core (or read cache)
     cachefile = basepath / 'core'
-    version_key = dict(format=FORMAT_VERSION, game_buildid=arkman.getGameBuildId(), inclusions=inclusions, exclusions=exclusions)
-    relations = cache_data(version_key, cachefile, lambda _: _scan_core(arkman))
+    version_key = _get_core_version_key(arkman)
+    relations = cache_data(version_key, cachefile, lambda _: _scan_core(arkman, basepath))
 
     # Scan /Game/Mods/<modid> for each installed mod (or read cache)
     for modid in get_managed_mods():
         cachefile = basepath / f'mod-{modid}'
-        mod_version = arkman.getModData(modid)['version']  # type:ignore
-        version_key = dict(format=FORMAT_VERSION, mod_version=mod_version, inclusions=inclusions, exclusions=exclusions)
-        mod_relations = cache_data(version_key, cachefile, lambda _: _scan_mod(modid, arkman))
+        version_key = _get_mod_version_key(arkman, modid)
+        mod_relations = cache_data(version_key, cachefile, lambda _: _scan_mod(modid, arkman, basepath))
         relations.extend(mod_relations)
 
     return relations
 
 
-def _scan_core(arkman: ArkSteamManager, verbose: bool = False) -> List[Tuple[str, str]]:
+def _scan_core(arkman: ArkSteamManager, basepath: Path, verbose: bool = False) -> List[Tuple[str, str]]:
     relations: List[Tuple[str, str]] = list()
+    file_cache = FileRelationCache.load(basepath / 'core-files')
 
     # Gather all inheritance relationships from core files
     logger.info('Discovering inheritance for: /Game')
-    for name, parent in _explore_path('/Game', False, arkman, verbose=verbose):
+    for name, parent in _explore_path('/Game', False, arkman, file_cache, verbose=verbose):
         relations.append((name, parent))
 
     # Gather all inheritance relationships from core 'mods'
@@ -141,73 +181,168 @@ def _scan_core(arkman: ArkSteamManager, verbose: bool = False) -> List[Tuple[str
         dirname = arkman.gamedata_path / 'ShooterGame' / 'Content' / modpath[6:]
         if dirname and Path(dirname).is_dir():
             logger.info(f'Discovering inheritance for: {modpath}')
-            for name, parent in _explore_path(modpath, True, arkman, verbose=verbose):
+            for name, parent in _explore_path(modpath, True, arkman, file_cache, verbose=verbose):
                 relations.append((name, parent))
 
+    file_cache.save()
+
     # Make the result stable and repeatable for hashing purposes
     relations.sort()
     return relations
 
 
-def _scan_mod(modid: str, arkman: ArkSteamManager, verbose=False) -> List[Tuple[str, str]]:
+def _scan_mod(modid: str, arkman: ArkSteamManager, basepath: Path, verbose=False) -> List[Tuple[str, str]]:
     relations: List[Tuple[str, str]] = list()
+    file_cache = FileRelationCache.load(basepath / f'mod-{modid}-files')
 
     modpath = f'/Game/Mods/{modid}/'
     logger.info('Discovering inheritance for mod: %s', modid)
 
-    for name, parent in _explore_path(modpath, True, arkman, verbose=verbose):
+    for name, parent in _explore_path(modpath, True, arkman, file_cache, verbose=verbose):
         relations.append((name, parent))
 
+    file_cache.save()
+
     # Make the result stable and repeatable for hashing purposes
     relations.sort()
     return relations
 
 
+class FileRelationCache:
+    '''
+    Relations discovered from each asset, cached against the size and modification time of its file.
+
+    Only entries that are looked up or stored during a scan are saved, so removed assets are dropped.
+    '''
+
+    def __init__(self, filename: Optional[Path] = None, entries: Optional[Dict[str, FileEntry]] = None):
+        self.filename = filename
+        self.previous: Dict[str, FileEntry] = entries or dict()
+        self.entries: Dict[str, FileEntry] = dict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, filename: Path) -> 'FileRelationCache':
+        entries = load_cached_data(_get_file_cache_key(), filename)
+        return cls(filename, entries)
+
+    def save(self):
+        logger.info('Re-used cached relations for %d assets, read %d', self.hits, self.misses)
+        if self.filename:
+            save_cached_data(_get_file_cache_key(), self.filename, self.entries)
+
+    def get(self, assetname: str, stamp: FileStamp) -> Optional[AssetRelations]:
+        entry = self.previous.get(assetname)
+        if entry is None or entry[0] != stamp:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries[assetname] = entry
+        return entry[1]
+
+    def set(self, stamp: FileStamp, result: AssetRelations):
+        self.entries[result[0]] = (stamp, result)
+
+
 def _explore_path(path: str,
                   is_mod: bool,
                   arkman: ArkSteamManager,
+                  file_cache: Optional[FileRelationCache] = None,
                   verbose: bool = False) -> Generator[Tuple[str, str], None, None]:
-    n = 0
-
     includes = set(arkman.config.optimisation.SearchInclude)
     mod_excludes = set(arkman.config.optimisation.SearchIgnore)
     core_excludes = set(['/Game/Mods/.*', *arkman.config.optimisation.SearchIgnore])
     excludes = mod_excludes if is_mod else core_excludes
 
     loader = arkman.getLoader()
+    file_cache = file_cache or FileRelationCache()
+
+    asset_iterator = loader.find_assetnames(path,
+                                            include=includes,
+                                            exclude=excludes,
+                                            extension=ue.hierarchy.asset_extensions,
+                                            return_extension=False)
+
+    # Resolve each asset to its file, re-using cached relations where the file is unchanged
+    results: Dict[str, AssetRelations] = dict()
+    stamps: Dict[str, FileStamp] = dict()
+    files: List[AssetFile] = []
+    for assetname in asset_iterator:
+        try:
+            filename, ext = loader.find_asset_file(assetname)
+            stat = filename.stat()
+        except (AssetLoadException, OSError):
+            results[assetname] = (assetname, None, FAILED_LOAD)
+            continue
+
+        stamp = stamps[assetname] = (ext, stat.st_size, stat.st_mtime_ns)
+        cached = file_cache.get(assetname, stamp)
+        if cached:
+            results[assetname] = cached
+        else:
+            files.append((assetname, str(filename), ext))
+
+    processes = arkman.config.optimisation.DiscoveryProcesses or os.cpu_count() or 1
+    if processes > 1 and files:
+        new_results = _read_relations_in_parallel(files, processes, loader.use_mmap)
+    else:
+        new_results = _read_relations_serially(files, loader.use_mmap, quiet=not verbose)
+
+    for n, result in enumerate(new_results, start=1):
+        assetname = result[0]
+        if verbose and n % 200 == 0:
+            logger.info(assetname)
+
+        results[assetname] = result
+        file_cache.set(stamps[assetname], result)
+
+    for assetname, relations, failure in results.values():
+        if relations is None:
+            logger.warning(failure, assetname)
+            continue
+
+        for fullname, parent in relations:
+            if not parent:
+                raise ValueError(f"Unexpected missing parent for export: {fullname}")
+
+            yield (fullname, parent)
+
+
+def _read_relations_serially(files: List[AssetFile], use_mmap: bool, quiet: bool) -> Iterator[AssetRelations]:
+    for asset_file in files:
+        if not quiet:
+            logger.debug("Loading asset summary: %s", asset_file[0])
+
+        yield _read_relations_from_file(use_mmap, asset_file)
+
+
+def _read_relations_in_parallel(files: List[AssetFile], processes: int, use_mmap: bool) -> Iterator[AssetRelations]:
+    logger.info('Reading %d asset summaries using %d processes', len(files), processes)
+
+    # Results come back in submission order, keeping the output deterministic
+    chunks = [files[i:i + DISCOVERY_CHUNK_SIZE] for i in range(0, len(files), DISCOVERY_CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        chunk_results = executor.map(partial(_read_relations_from_files, use_mmap), chunks)
+        yield from chain.from_iterable(chunk_results)
+
+
+def _read_relations_from_files(use_mmap: bool, files: List[AssetFile]) -> List[AssetRelations]:
+    '''Worker process entry point, reading relations from a chunk of asset files.'''
+    return [_read_relations_from_file(use_mmap, asset_file) for asset_file in files]
+
+
+def _read_relations_from_file(use_mmap: bool, asset_file: AssetFile) -> AssetRelations:
+    assetname, filename, ext = asset_file
+
+    # Only the header and name/import/export tables are needed to discover parentage
+    try:
+        summary = load_asset_summary_from_file(filename, assetname, ext, use_mmap=use_mmap)
+    except AssetLoadException:
+        return (assetname, None, FAILED_LOAD)
 
-    with ue_parsing_context(properties=False, bulk_data=False):
-        asset_iterator = loader.find_assetnames(path,
-                                                include=includes,
-                                                exclude=excludes,
-                                                extension=ue.hierarchy.asset_extensions,
-                                                return_extension=True)
-        for (assetname, ext) in asset_iterator:
-            n += 1
-            if verbose and n % 200 == 0:
-                logger.info(assetname)
-
-            try:
-                asset = loader.load_asset(assetname, quiet=not verbose)
-            except AssetLoadException:
-                logger.warning("Failed to load asset: %s", assetname)
-                continue
-
-            try:
-                export: ExportTableItem
-                for export in ue.hierarchy._find_exports_to_store(asset, ext):
-                    parent = ue.hierarchy._get_parent_cls(export)
-                    fullname = export.fullname
-                    if not parent:
-                        raise ValueError(f"Unexpected missing parent for export: {fullname}")
-                    if not fullname:
-                        raise ValueError(f"Unexpected empty export name: {export.asset.assetname}.{export.name}")
-
-                    yield (fullname, parent)
-
-            except AssetLoadException:
-                logger.warning("Failed to check parentage of %s", assetname)
-
-            # Remove maps from the cache immediately as they are large and cannot be inherited from
-            if ext == '.umap':
-                loader.cache.remove(assetname)
+    try:
+        return (assetname, list(summary.iterate_class_relations()), None)
+    except IndexError:
+        return (assetname, None, FAILED_PARENTAGE)
@@ -1,7 +1,7 @@
 from itertools import repeat
 from typing import Mapping
 
-from ue.properties import ArrayProperty, LinearColor, ObjectProperty, StructProperty
+from ue.properties import ArrayProperty, BoolProperty, LinearColor, ObjectProperty, StructProperty
 from ue.proxy import LazyReference, ProxyComponent, UEProxyStructure, uebools, uebytes, uefloats, ueints, uestrings
 
 STAT_COUNT = 12
@@ -229,6 +229,21 @@ class PrimalDinoCharacter(UEProxyStructure, uetype=PDC_CLS):
     bIsTrapTamed = uebools(False)
     bPreventWildTrapping = uebools(False)
 
+    # Flags only read by name, when present
+    bAllowMountedWeaponry: Mapping[int, BoolProperty]
+    bAllowRidingInWater: Mapping[int, BoolProperty]
+    bCanBeDragged: Mapping[int, BoolProperty]
+    bCanDrag: Mapping[int, BoolProperty]
+    bCanMountOnHumans: Mapping[int, BoolProperty]
+    bDoStepDamage: Mapping[int, BoolProperty]
+    bIsAmphibious: Mapping[int, BoolProperty]
+    bIsBigDino: Mapping[int, BoolProperty]
+    bIsCarnivore: Mapping[int, BoolProperty]
+    bIsNPC: Mapping[int, BoolProperty]
+    bIsRaidDino: Mapping[int, BoolProperty]
+    bPreventCharacterBasing: Mapping[int, BoolProperty]
+    bPreventNeuter: Mapping[int, BoolProperty]
+
     # General
     CustomTag = uestrings('')  # NameProperty (Default: None)
     DescriptiveName = uestrings('')  # StringProperty (Default: 'PrimalCharacter')
@@ -244,6 +259,7 @@ class PrimalDinoCharacter(UEProxyStructure, uetype=PDC_CLS):
     ExtraBabyGestationSpeedMultiplier = uefloats(FLOAT_1_0)
     ExtraTamedBaseHealthMultiplier = uefloats(FLOAT_1_0)
     FertilizedEggItemsToSpawn: Mapping[int, ArrayProperty]  # = []
+    FertilizedEggWeightsToSpawn: Mapping[int, ArrayProperty]  # = []
     FemaleMatingTime = uefloats(0.0)
     NewFemaleMaxTimeBetweenMating = uefloats((172800.00000000, '00c02848'))
     NewFemaleMinTimeBetweenMating = uefloats((64800.00000000, '00207d47'))
@@ -11,7 +11,7 @@ import requests
 
 from ark.overrides import get_overrides
 from config import ConfigFile, get_global_config
-from ue.loader import AssetLoader, ModNotFound, ModResolver
+from ue.loader import AssetLoader, ContextAwareCacheWrapper, ModNotFound, ModResolver, UsageBasedCacheManager
 from utils.log import get_logger
 from utils.name_convert import uelike_prettify
 
@@ -44,6 +44,7 @@ class ArkSteamManager:
         self.steamcmd_path: Path = self.basepath / 'Steam'
         self.gamedata_path: Path = self.basepath / f'app-{self.appid}'
         self.asset_path: Path = self.gamedata_path / 'ShooterGame'
+        self.persistent_cache_path: Path = self.basepath / f'parsed-assets-{self.appid}'
         self.mods_path: Path = self.asset_path / 'Content' / 'Mods'
 
         self.steamcmd = Steamcmd(self.steamcmd_path)
@@ -68,11 +69,18 @@ class ArkSteamManager:
         rewrites = get_overrides().rewrites.assets or dict()
         mod_aliases = self.config.combine_mods.src_to_aliases
         modresolver = ManagedModResolver(self)
+        cache_manager = UsageBasedCacheManager(max_memory=self.config.optimisation.AssetCacheMemoryMB * 1024 * 1024)
         loader = AssetLoader(
             modresolver=modresolver,
+            cache_manager=ContextAwareCacheWrapper(cache_manager),
             assetpath=self.asset_path,
             rewrites=rewrites,
             mod_aliases=mod_aliases,
+            use_mmap=self.config.optimisation.MemoryMapAssets,
+            lazy_properties=self.config.optimisation.LazyProperties,
+            persistent_cache_path=self.persistent_cache_path if self.config.optimisation.PersistentAssetCache else None,
+            prefetch_count=self.config.optimisation.PrefetchAssets,
+            parse_processes=self.config.optimisation.ParseProcesses,
         )
         return loader
 
@@ -210,6 +218,10 @@ class ArkSteamManager:
         else:
             logger.info('(skipped)')
 
+        # Make sure the loader sees the files that were added or removed
+        if self.loader and not dryRun and (modids_update or (uninstallOthers and modids_remove)):
+            self.loader.invalidate_path_index()
+
         # Remove mod data for mods that are no longer present
         for modid in modids_remove:
             self.mod_data_cache.pop(modid, None)
@@ -97,6 +97,15 @@ class ProcessingSection(BaseModel):
 class OptimisationSection(BaseModel):
     SearchInclude: IniStringList = IniStringList()
     SearchIgnore: IniStringList = IniStringList()
+    MemoryMapAssets: bool = False
+    DiscoveryProcesses: int = 1
+    LazyProperties: bool = False
+    PersistentAssetCache: bool = False
+    AssetCacheMemoryMB: int = 6144
+    PrefetchAssets: int = 0
+    ParseProcesses: int = 0
+    SinglePassExtraction: bool = False
+    KeepModAssetsBetweenStages: bool = False
 
     class Config:
         extra = Extra.forbid
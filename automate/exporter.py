@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
+from collections import defaultdict
 from pathlib import Path, PurePosixPath
-from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
 from ark.mod import get_aliases_for_mod, get_core_mods, get_separate_mods
 from ark.overrides import get_overrides_for_mod
@@ -22,6 +23,7 @@ logger = get_logger(__name__)
 
 __all__ = [
     'ExportStage',
+    'StageExtraction',
     'ExportManager',
 ]
 
@@ -56,6 +58,25 @@ class ExportRoot(metaclass=ABCMeta):
         return True
 
 
+class StageExtraction(metaclass=ABCMeta):
+    '''
+    A stage's extraction in progress, fed each of its classes by the manager.
+    Used when several stages share a single pass over the classes they need.
+    '''
+    type_name: str
+    filter: Optional[Callable[[str], bool]] = None
+
+    @abstractmethod
+    def add(self, proxy: UEProxyStructure):
+        '''Extract data from the next class of the requested type.'''
+        ...
+
+    @abstractmethod
+    def finish(self):
+        '''Called after all classes have been added, to save the results.'''
+        ...
+
+
 class ExportStage(metaclass=ABCMeta):
     section_name: str
     manager: ExportManager
@@ -81,6 +102,20 @@ class ExportStage(metaclass=ABCMeta):
         '''Perform extraction for the specified mod.'''
         ...
 
+    def begin_core_extraction(self, path: Path) -> Optional[StageExtraction]:  # pylint: disable=unused-argument
+        '''
+        Begin an extraction for core data that will be fed classes by the manager, alongside other stages.
+        Return None (the default) to instead be run alone using `extract_core`.
+        '''
+        return None
+
+    def begin_mod_extraction(self, path: Path, modid: str) -> Optional[StageExtraction]:  # pylint: disable=unused-argument
+        '''
+        Begin an extraction for the specified mod that will be fed classes by the manager, alongside other stages.
+        Return None (the default) to instead be run alone using `extract_mod`.
+        '''
+        return None
+
 
 class ExportManager:
     official_mod_prefixes: Tuple[str, ...]
@@ -101,7 +136,11 @@ class ExportManager:
 
     def perform(self):
         '''Run the defined root/stages structure.'''
-        self._perform_export()
+        try:
+            self._perform_export()
+        finally:
+            # Don't leave background workers running once the export is over
+            self.loader.close()
 
     def _get_name_for_stage(self, root: ExportRoot, stage: Optional[ExportStage]) -> str:
         root_name = root.__class__.__name__.replace('Root', '')
@@ -116,7 +155,6 @@ class ExportManager:
 
     def _perform_export(self):
         game_version = self.arkman.getGameVersion()
-        base_path = self.config.settings.OutputPath
 
         modids = get_separate_mods()
 
@@ -146,33 +184,11 @@ class ExportManager:
 
         # Extract : Core : Run each stage of each root
         self.official_mod_prefixes = tuple(f'/Game/Mods/{modid}/' for modid in get_core_mods())
-        overrides = get_overrides_for_mod('')
-        for root in self.roots:
-            root_path = Path(base_path / root.get_relative_path())
-            for stage in root.stages:
-                if not should_run_section(stage.section_name, self.config.run_sections):
-                    continue
-                if not should_run_section(stage.section_name, overrides.include_in_stages):
-                    continue
-                logger.info('Extracting %s in core', self._get_name_for_stage(root, stage))
-                stage.extract_core(root_path)
-                self._log_stats()
+        self._extract_stages(None)
 
         # Extract : Mods : Run each stage of each root
         for modid in modids:
-            overrides = get_overrides_for_mod(modid)
-            for root in self.roots:
-                root_path = Path(base_path / root.get_relative_path())
-                for stage in root.stages:
-                    if not should_run_section(stage.section_name, self.config.run_sections):
-                        continue
-                    if not should_run_section(stage.section_name, overrides.include_in_stages):
-                        continue
-                    logger.info("Extracting %s in mod %s '%s'", self._get_name_for_stage(root, stage), modid,
-                                self._get_mod_name(modid))
-                    stage.extract_mod(root_path, modid)
-                    self._clear_mod_from_cache(modid)
-                    self._log_stats()
+            self._extract_stages(modid)
 
         # Finish up : manifests, commit
         for root in self.roots:
@@ -185,6 +201,91 @@ class ExportManager:
             if root.get_should_commit():
                 self.git.after_exports(root.path.relative_to(outdir), root.get_commit_header(), self._commit_line_for_file)
 
+    def _get_stages_to_run(self, modid: Optional[str]) -> List[Tuple[ExportStage, Path]]:
+        '''Find the enabled stages of every root for core (modid None) or the given mod, with their root's path.'''
+        overrides = get_overrides_for_mod(modid or '')
+        stages: List[Tuple[ExportStage, Path]] = []
+        for root in self.roots:
+            root_path = Path(self.config.settings.OutputPath / root.get_relative_path())
+            for stage in root.stages:
+                if not should_run_section(stage.section_name, self.config.run_sections):
+                    continue
+                if not should_run_section(stage.section_name, overrides.include_in_stages):
+                    continue
+                stages.append((stage, root_path))
+
+        return stages
+
+    def _extract_stages(self, modid: Optional[str]):
+        '''Run each enabled stage for core (modid None) or the given mod.'''
+        stages = self._get_stages_to_run(modid)
+
+        # Stages that support it share a single pass over their classes, run in place of the first of them
+        extractions: Dict[ExportStage, StageExtraction] = dict()
+        if self.config.optimisation.SinglePassExtraction:
+            for stage, root_path in stages:
+                if modid:
+                    extraction = stage.begin_mod_extraction(root_path, modid)
+                else:
+                    extraction = stage.begin_core_extraction(root_path)
+                if extraction:
+                    extractions[stage] = extraction
+
+        # A mod's assets are normally dropped from the cache after each stage, but can be kept until all are done
+        clear_each_stage = not self.config.optimisation.KeepModAssetsBetweenStages
+
+        shared_pending = bool(extractions)
+        for stage, root_path in stages:
+            if stage in extractions:
+                if shared_pending:
+                    shared_pending = False
+                    names = ', '.join(self._get_name_for_stage(shared.root, shared) for shared in extractions)
+                    if modid:
+                        logger.info("Extracting %s in mod %s '%s'", names, modid, self._get_mod_name(modid))
+                    else:
+                        logger.info('Extracting %s in core', names)
+                    self._perform_shared_extraction(list(extractions.values()), modid)
+                    if modid and clear_each_stage:
+                        self._clear_mod_from_cache(modid)
+                    self._log_stats()
+                continue
+
+            if modid:
+                logger.info("Extracting %s in mod %s '%s'", self._get_name_for_stage(stage.root, stage), modid,
+                            self._get_mod_name(modid))
+                stage.extract_mod(root_path, modid)
+                if clear_each_stage:
+                    self._clear_mod_from_cache(modid)
+            else:
+                logger.info('Extracting %s in core', self._get_name_for_stage(stage.root, stage))
+                stage.extract_core(root_path)
+            self._log_stats()
+
+        if modid and not clear_each_stage:
+            self._clear_mod_from_cache(modid)
+
+    def _perform_shared_extraction(self, extractions: Sequence[StageExtraction], modid: Optional[str]):
+        '''
+        Load and gather each class needed by any of the extractions only once, passing the proxy to each extraction
+        that wants it. Each extraction receives the same classes, in the same order, as it would if run alone.
+        '''
+        wanted: Dict[str, List[StageExtraction]] = defaultdict(list)
+        for extraction in extractions:
+            if modid:
+                classes = self.find_mod_classes_of_type(extraction.type_name, modid, filter=extraction.filter)
+            else:
+                classes = self.find_core_classes_of_type(extraction.type_name, filter=extraction.filter)
+
+            for cls_name in self._exclude_default_counterparts(classes):
+                wanted[cls_name].append(extraction)
+
+        for cls_name, proxy in self._load_and_gather(sorted(wanted)):
+            for extraction in wanted[cls_name]:
+                extraction.add(proxy)
+
+        for extraction in extractions:
+            extraction.finish()
+
     def _commit_line_for_file(self, filename: str) -> Optional[str]:
         '''Works out a reasonable single-line commit comment for the given file path.'''
         path = PurePosixPath(self.config.settings.OutputPath / filename)
@@ -259,8 +360,18 @@ class ExportManager:
         self.loader.wipe_cache_with_prefix(prefix)
 
     def _log_stats(self):
-        max_mem = self.loader.max_memory / 1024.0 / 1024.0
-        logger.debug("Stats: max mem = %6.2f Mb, max cache entries = %d", max_mem, self.loader.max_cache)
+        stats = self.loader.stats
+        stats.sample_memory()
+        max_mem = stats.max_memory / 1024.0 / 1024.0
+        logger.debug("Stats: max mem = %6.2f Mb, max cache entries = %d", max_mem, stats.max_cache)
+        logger.debug("Stats: %d loads (%d cache hits, %d misses), %d parsed and %d upgraded in %.2fs from %.2f Mb", stats.loads,
+                     stats.cache_hits, stats.cache_misses, stats.assets_parsed, stats.assets_upgraded, stats.parse_time,
+                     stats.bytes_read / 1024.0 / 1024.0)
+        if self.loader.parse_service:
+            logger.debug("Stats: %d assets parsed by worker processes", stats.assets_from_workers)
+        persistent_cache = self.loader.persistent_cache
+        if persistent_cache:
+            logger.debug("Stats: parsed asset store hits = %d, misses = %d", persistent_cache.hits, persistent_cache.misses)
 
     def iterate_core_exports_of_type(self, type_name: str, sort=True, filter=None) -> Iterator[UEProxyStructure]:
         '''
@@ -268,6 +379,20 @@ class ExportManager:
         Classes that have a 'Default__' counterpart are excluded from the output.
         By default the results are sorted by class fullname.
         '''
+        classes = self.find_core_classes_of_type(type_name, filter=filter)
+        yield from self._iterate_exports(classes, sort)
+
+    def iterate_mod_exports_of_type(self, type_name: str, modid: str, sort=True, filter=None) -> Iterator[UEProxyStructure]:
+        '''
+        Yields a ready-to-use proxy for each class that inherits from `type_name` and exists in the specified mod.
+        Classes that have a 'Default__' counterpart are excluded from the output.
+        By default the results are sorted by class fullname.
+        '''
+        classes = self.find_mod_classes_of_type(type_name, modid, filter=filter)
+        yield from self._iterate_exports(classes, sort)
+
+    def find_core_classes_of_type(self, type_name: str, filter=None) -> Set[str]:
+        '''Find the fullnames of classes that inherit from `type_name` and exist in the core+DLC of the game.'''
         # Gather classes of this type in the core
         # (core path prefixes were pre-calculated earlier)
         classes: Set[str] = set()
@@ -284,15 +409,10 @@ class ExportManager:
 
             classes.add(cls_name)
 
-        # The rest of the work is shared
-        yield from self._iterate_exports(classes, sort)
+        return classes
 
-    def iterate_mod_exports_of_type(self, type_name: str, modid: str, sort=True, filter=None) -> Iterator[UEProxyStructure]:
-        '''
-        Yields a ready-to-use proxy for each class that inherits from `type_name` and exists in the specified mod.
-        Classes that have a 'Default__' counterpart are excluded from the output.
-        By default the results are sorted by class fullname.
-        '''
+    def find_mod_classes_of_type(self, type_name: str, modid: str, filter=None) -> Set[str]:
+        '''Find the fullnames of classes that inherit from `type_name` and exist in the specified mod.'''
         # Look for other mods that should be combined
         mod_tag = self.loader.get_mod_name(f'/Game/Mods/{modid}/')
         if not mod_tag:
@@ -314,36 +434,50 @@ class ExportManager:
                     classes.add(cls_name)
                     break
 
-        # The rest of the work is shared
-        yield from self._iterate_exports(classes, sort)
+        return classes
 
-    def _iterate_exports(self, classes: Set[str], sort: bool) -> Iterator[UEProxyStructure]:
+    def _exclude_default_counterparts(self, classes: Set[str]) -> Set[str]:
         # Exclude classes that have a Default__ counterpart
         to_remove = []
         for cls_name in classes:
             if '.Default__' in cls_name:
                 to_remove.append(cls_name.replace('Default__', ''))
 
-        classes -= set(to_remove)
+        return classes - set(to_remove)
+
+    def _iterate_exports(self, classes: Set[str], sort: bool) -> Iterator[UEProxyStructure]:
+        classes = self._exclude_default_counterparts(classes)
 
         # Sort them to help with consistent outputs, if requested
-        output_order = sorted(classes) if sort else classes
+        output_order = sorted(classes) if sort else list(classes)
+
+        for _, proxy in self._load_and_gather(output_order):
+            yield proxy
+
+    def _load_and_gather(self, output_order: List[str]) -> Iterator[Tuple[str, UEProxyStructure]]:
+        # Read upcoming assets in the background while each is parsed
+        prefetch_queue = self.loader.prefetch(cls_name[:cls_name.index('.')] for cls_name in output_order)
 
         # Load and output each one
-        for cls_name in output_order:
-            try:
-                export = self.loader.load_class(cls_name)
-            except AssetLoadException:
-                logger.warning('Failed to load asset during export: %s', cls_name)
-                continue
+        try:
+            for cls_name in output_order:
+                try:
+                    export = self.loader.load_class(cls_name)
+                except AssetLoadException:
+                    logger.warning('Failed to load asset during export: %s', cls_name)
+                    continue
+                finally:
+                    self.loader.release_prefetch(prefetch_queue, cls_name[:cls_name.index('.')])
 
-            try:
-                proxy: UEProxyStructure = gather_properties(export)
-            except Exception:  # pylint: disable=broad-except
-                logger.warning('Failed to gather properties from asset: %s', cls_name)
-                continue
+                try:
+                    proxy: UEProxyStructure = gather_properties(export, declared_only=True)
+                except Exception:  # pylint: disable=broad-except
+                    logger.warning('Failed to gather properties from asset: %s', cls_name)
+                    continue
 
-            yield proxy
+                yield (cls_name, proxy)
+        finally:
+            self.loader.cancel_prefetch(prefetch_queue)
 
     def get_mod_version(self, modid: str) -> str:
         return self.arkman.getModData(modid)['version']  # type: ignore
@@ -1,6 +1,6 @@
 from abc import ABCMeta, abstractmethod
 from pathlib import Path, PurePosixPath
-from typing import Any, Dict, Iterator, List, Optional, Type
+from typing import Any, Dict, List, Optional, Type
 
 from pydantic import BaseModel, Field
 
@@ -10,13 +10,14 @@ from ue.proxy import UEProxyStructure
 from ue.utils import sanitise_output
 from utils.strings import get_valid_filename
 
-from .exporter import ExportStage
+from .exporter import ExportStage, StageExtraction
 
 __all__ = [
     'Field',
     'ExportModel',
     'ExportFileModel',
     'JsonHierarchyExportStage',
+    'HierarchyExtraction',
 ]
 
 
@@ -155,6 +156,18 @@ class JsonHierarchyExportStage(ExportStage, metaclass=ABCMeta):
         ...
 
     def extract_core(self, path: Path):
+        extraction = self.begin_core_extraction(path)
+        for proxy in self.manager.iterate_core_exports_of_type(extraction.type_name, filter=extraction.filter):
+            extraction.add(proxy)
+        extraction.finish()
+
+    def extract_mod(self, path: Path, modid: str):
+        extraction = self.begin_mod_extraction(path, modid)
+        for proxy in self.manager.iterate_mod_exports_of_type(extraction.type_name, modid, filter=extraction.filter):
+            extraction.add(proxy)
+        extraction.finish()
+
+    def begin_core_extraction(self, path: Path) -> 'HierarchyExtraction':
         # Prepare a schema, if requested
         schema_file: Optional[PurePosixPath] = None
         schema_model = self.get_schema_model()  # pylint: disable=assignment-from-none # stupid pylint
@@ -166,10 +179,9 @@ class JsonHierarchyExportStage(ExportStage, metaclass=ABCMeta):
         version = createExportVersion(self.manager.arkman.getGameVersion(), self.manager.arkman.getGameBuildId())  # type: ignore
 
         filename = self.get_core_file_path()
-        proxy_iter = self.manager.iterate_core_exports_of_type(self.get_ue_type(), filter=self.pre_load_filter)
-        self._extract_and_save(version, None, path, filename, proxy_iter, schema_file=schema_file)
+        return HierarchyExtraction(self, version, None, path, filename, schema_file=schema_file)
 
-    def extract_mod(self, path: Path, modid: str):
+    def begin_mod_extraction(self, path: Path, modid: str) -> 'HierarchyExtraction':
         # Re-use the core's schema, if existing
         schema_file: Optional[PurePosixPath] = None
         schema_model = self.get_schema_model()  # pylint: disable=assignment-from-none # stupid pylint
@@ -180,70 +192,89 @@ class JsonHierarchyExportStage(ExportStage, metaclass=ABCMeta):
         version = createExportVersion(self.manager.arkman.getGameVersion(), self.manager.get_mod_version(modid))  # type: ignore
 
         filename = self.get_mod_file_path(modid)
-        proxy_iter = self.manager.iterate_mod_exports_of_type(self.get_ue_type(), modid, filter=self.pre_load_filter)
-        self._extract_and_save(version, modid, path, filename, proxy_iter, schema_file=schema_file)
-
-    def _extract_and_save(self,
-                          version: str,
-                          modid: Optional[str],
-                          base_path: Path,
-                          relative_path: PurePosixPath,
-                          proxy_iter: Iterator[UEProxyStructure],
-                          *,
-                          schema_file: Optional[PurePosixPath] = None):
+        return HierarchyExtraction(self, version, modid, path, filename, schema_file=schema_file)
+
+
+class HierarchyExtraction(StageExtraction):
+    '''
+    Collects the output of a `JsonHierarchyExportStage` as classes are added, saving it once finished.
+    '''
+
+    def __init__(self,
+                 stage: JsonHierarchyExportStage,
+                 version: str,
+                 modid: Optional[str],
+                 base_path: Path,
+                 relative_path: PurePosixPath,
+                 *,
+                 schema_file: Optional[PurePosixPath] = None):
+        self.stage = stage
+        self.modid = modid
+        self.schema_file = schema_file
+        self.type_name = stage.get_ue_type()
+        self.filter = stage.pre_load_filter
+
         # Work out the output path (cleaned)
         clean_relative_path = PurePosixPath(*(get_valid_filename(p) for p in relative_path.parts))
-        output_path = Path(base_path / clean_relative_path)
+        self.output_path = Path(base_path / clean_relative_path)
 
         # Setup the output structure
-        results: List[Any] = []
-        format_version = self.get_format_version()
-        output: Dict[str, Any] = dict()
+        self.results: List[Any] = []
+        self.expected_subtype: Optional[Type[BaseModel]] = None
+        format_version = stage.get_format_version()
+        self.output: Dict[str, Any] = dict()
         if schema_file:
-            model = self.get_schema_model()  # pylint: disable=assignment-from-none # stupid pylint
+            model = stage.get_schema_model()  # pylint: disable=assignment-from-none # stupid pylint
             assert model
-            expected_subtype = _get_model_list_field_type(model, self.get_field())
-            output['$schema'] = str(_calculate_relative_path(clean_relative_path, schema_file))
-        output['version'] = version
-        output['format'] = format_version
+            self.expected_subtype = _get_model_list_field_type(model, stage.get_field())
+            self.output['$schema'] = str(_calculate_relative_path(clean_relative_path, schema_file))
+        self.output['version'] = version
+        self.output['format'] = format_version
+
+    def add(self, proxy: UEProxyStructure):
+        # Do the actual export into the existing `results` list
+        item_output = self.stage.extract(proxy)
+        if item_output:
+            expected_subtype = self.expected_subtype
+            if self.schema_file and expected_subtype and not isinstance(item_output, expected_subtype):
+                raise TypeError(f"Expected {expected_subtype} from schema-enabled exported item but got {type(item_output)}")
+
+            item_output = sanitise_output(item_output)
+            self.results.append(item_output)
+
+    def finish(self):
+        stage = self.stage
+        results = self.results
+        output = self.output
 
         # Pre-data comes before the main items
-        pre_data = self.get_pre_data(modid) or dict()
+        # (it is only requested now so that it sees the same state as when the stage is run alone)
+        pre_data = stage.get_pre_data(self.modid) or dict()
         pre_data = sanitise_output(pre_data)
         output.update(pre_data)
 
         # Main items array
-        output[self.get_field()] = results
-
-        # Do the actual export into the existing `results` list
-        for proxy in proxy_iter:
-            item_output = self.extract(proxy)
-            if item_output:
-                if schema_file and expected_subtype and not isinstance(item_output, expected_subtype):
-                    raise TypeError(f"Expected {expected_subtype} from schema-enabled exported item but got {type(item_output)}")
-
-                item_output = sanitise_output(item_output)
-                results.append(item_output)
+        output[stage.get_field()] = results
 
         # Make the results available to get_post_data
-        self.gathered_results = results
+        stage.gathered_results = results
 
         # Post-data comes after the main items
-        post_data = self.get_post_data(modid) or {}
+        post_data = stage.get_post_data(self.modid) or {}
         post_data = sanitise_output(post_data)
         output.update(post_data)
         post_data_has_content = post_data and any(post_data.values())
 
         # Clear gathered data reference
-        del self.gathered_results
+        del stage.gathered_results
 
         # Save if the data changed
         if results or post_data_has_content:
-            save_json_if_changed(output, output_path, self.get_use_pretty())
+            save_json_if_changed(output, self.output_path, stage.get_use_pretty())
         else:
             # ...but remove an existing one if the output was empty
-            if output_path.is_file():
-                output_path.unlink()
+            if self.output_path.is_file():
+                self.output_path.unlink()
 
 
 def _get_model_field_type(model_type: Type[BaseModel], field_name: str) -> Optional[Type[BaseModel]]:
@@ -47,7 +47,7 @@ def gather_breeding_data(char_props: PrimalDinoCharacter, loader: AssetLoader) -
             # We only provide the highest possibility egg to ASB
             fert_egg_asset = loader.load_related(eggs[0][0])
             assert fert_egg_asset.default_export
-            egg_props: PrimalItem = ue.gathering.gather_properties(fert_egg_asset.default_export)
+            egg_props: PrimalItem = ue.gathering.gather_properties(fert_egg_asset.default_export, declared_only=True)
             egg_decay = egg_props.EggLoseDurabilityPerSecond[0].rounded_value
             extra_egg_decay_m = egg_props.ExtraEggLoseDurabilityPerSecondMultiplier[0].rounded_value
 
@@ -51,7 +51,7 @@ def gather_pgd_colors(asset: UAsset,
         dyes = list()
         for dye_asset in (loader.load_related(entry) for entry in dye_defs):
             assert dye_asset and dye_asset.default_export
-            dye_props: PrimalItem_Dye = ue.gathering.gather_properties(dye_asset.default_export)
+            dye_props: PrimalItem_Dye = ue.gathering.gather_properties(dye_asset.default_export, declared_only=True)
             name = dye_props.DescriptiveNameBase[0] or '~~unset~~'
             value = dye_props.DyeColor[0]
             color = value.values[0].as_tuple() if value else None
@@ -58,7 +58,7 @@ ARK_STAT_INDEXES = tuple(range(12))
 def values_from_pgd(asset: UAsset, require_override: bool = False) -> Dict[str, Any]:
     assert asset and asset.loader and asset.default_export
     loader = asset.loader
-    pgd_props: PrimalGameData = ue.gathering.gather_properties(asset.default_export)
+    pgd_props: PrimalGameData = ue.gathering.gather_properties(asset.default_export, declared_only=True)
 
     result: Dict[str, Any] = dict()
 
@@ -80,7 +80,7 @@ def should_skip_from_variants(variants: Set[str], overrides: OverrideSettings) -
 def values_for_species(asset: UAsset, proxy: PrimalDinoCharacter) -> Optional[Dict[str, Any]]:
     assert asset.loader and asset.default_export and asset.default_class and asset.default_class.fullname
 
-    char_props: PrimalDinoCharacter = ue.gathering.gather_properties(asset.default_export)
+    char_props: PrimalDinoCharacter = ue.gathering.gather_properties(asset.default_export, declared_only=True)
     dcsc_props: PrimalDinoStatusComponent = ark.gathering.gather_dcsc_properties(asset.default_export)
     dcsc_alt_props: PrimalDinoStatusComponent = ark.gathering.gather_dcsc_properties(asset.default_export, alt=True)
 
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, List, Optional, cast
 
 from ark.types import PrimalColorSet
 from automate.hierarchy_exporter import ExportFileModel, ExportModel, JsonHierarchyExportStage
@@ -29,6 +29,7 @@ class EventColorsExportModel(ExportFileModel):
 
 
 class EventColorsStage(JsonHierarchyExportStage):
+    event_color_sets: Optional[List[str]] = None
 
     def get_format_version(self) -> str:
         return "1"
@@ -48,16 +49,18 @@ class EventColorsStage(JsonHierarchyExportStage):
     def get_schema_model(self):
         return EventColorsExportModel
 
-    def get_pre_data(self, modid: Optional[str]) -> Optional[Dict[str, Any]]:
+    def get_event_color_sets(self) -> List[str]:
         # Fetch TestGameMode and find see which DinoColorSets it references
-        asset = self.manager.loader[TESTGAMEMODE_ASSET]
-        color_set_imports = [imp for imp in asset.imports if inherits_from(imp.fullname, SCRIPT_COLORSET, safe=True)]
-        self.event_color_sets = [imp.fullname for imp in color_set_imports]
-        return None
+        if self.event_color_sets is None:
+            asset = self.manager.loader[TESTGAMEMODE_ASSET]
+            color_set_imports = [imp for imp in asset.imports if inherits_from(imp.fullname, SCRIPT_COLORSET, safe=True)]
+            self.event_color_sets = [imp.fullname for imp in color_set_imports]
+
+        return self.event_color_sets
 
     def pre_load_filter(self, cls_name: str) -> bool:
         # We're only interested if the color set is ref'd from TestGameMode
-        if cls_name not in self.event_color_sets:
+        if cls_name not in self.get_event_color_sets():
             return False
 
         return True
@@ -129,3 +129,9 @@ class MockCacheManager(CacheManager):
 
     def get_count(self):
         raise NotImplementedError
+
+
+class FakeAsset:
+
+    def __init__(self, estimated_size: int):
+        self.estimated_size = estimated_size
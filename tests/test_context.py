@@ -1,3 +1,5 @@
+from pathlib import Path
+
 import pytest
 
 from ue.context import ue_parsing_context
@@ -59,6 +61,23 @@ def test_properties(loader: AssetLoader):
         assert asset.has_properties
 
 
+@pytest.mark.requires_game
+def test_properties_added_to_cached_asset(loader: AssetLoader):
+    loader.wipe_cache()
+    with ue_parsing_context(properties=False):
+        asset = loader[TEST_PGD_PKG]
+        assert asset.is_linked
+        assert not asset.has_properties
+
+    # Check the cached asset is upgraded in place rather than re-parsed
+    with ue_parsing_context(properties=True):
+        upgraded = loader[TEST_PGD_PKG]
+        assert upgraded is asset
+        assert upgraded.has_properties
+        assert upgraded.default_export
+        assert upgraded.default_export.properties
+
+
 @pytest.mark.requires_game
 def test_no_properties_without_link(loader: AssetLoader):
     loader.wipe_cache()
@@ -83,3 +102,56 @@ def test_bulk_data(loader: AssetLoader):
     with ue_parsing_context(bulk_data=True):
         asset = loader[TEST_PGD_PKG]
         assert asset.has_bulk_data
+
+
+@pytest.mark.requires_game
+def test_lazy_properties(loader: AssetLoader):
+    lazy_loader = AssetLoader(modresolver=loader.modresolver, assetpath=loader.asset_path, lazy_properties=True)
+    asset = lazy_loader[TEST_PGD_PKG]
+    assert asset.has_properties
+
+    # Properties are only deserialised when first accessed
+    export = asset.default_export
+    assert export
+    assert 'properties' not in export.field_values
+    assert export.properties
+    assert 'properties' in export.field_values
+
+
+@pytest.mark.requires_game
+def test_persistent_asset_cache(loader: AssetLoader, tempdir: Path):
+    first_loader = AssetLoader(modresolver=loader.modresolver, assetpath=loader.asset_path, persistent_cache_path=tempdir)
+    asset = first_loader[TEST_PGD_PKG]
+    assert first_loader.persistent_cache
+    assert first_loader.persistent_cache.misses == 1
+
+    # A second loader is served the stored asset without parsing it
+    second_loader = AssetLoader(modresolver=loader.modresolver, assetpath=loader.asset_path, persistent_cache_path=tempdir)
+    stored_asset = second_loader[TEST_PGD_PKG]
+    assert second_loader.persistent_cache
+    assert second_loader.persistent_cache.hits == 1
+    assert stored_asset is not asset
+    assert stored_asset.loader is second_loader
+    assert stored_asset.has_properties
+    assert stored_asset.default_export and asset.default_export
+    assert str(stored_asset.default_export.name) == str(asset.default_export.name)
+    assert len(stored_asset.default_export.properties) == len(asset.default_export.properties)
+
+
+@pytest.mark.requires_game
+def test_parse_service(loader: AssetLoader):
+    asset = loader[TEST_PGD_PKG]
+
+    service_loader = AssetLoader(modresolver=loader.modresolver, assetpath=loader.asset_path, parse_processes=2)
+    try:
+        (parsed_asset, ) = service_loader.load_many([TEST_PGD_PKG])
+        assert service_loader.stats.assets_from_workers == 1
+        assert service_loader.stats.assets_parsed == 0
+        assert parsed_asset.loader is service_loader
+        assert parsed_asset.has_properties
+        assert parsed_asset.default_export and asset.default_export
+        assert str(parsed_asset.default_export.name) == str(asset.default_export.name)
+        assert len(parsed_asset.default_export.properties) == len(asset.default_export.properties)
+    finally:
+        # Don't leave the worker processes running
+        service_loader.close()
@@ -1,6 +1,9 @@
+from pathlib import Path
+
 import pytest
 
 import ark.discovery
+from ark.discovery import AssetRelations, FileRelationCache
 from automate.ark import ArkSteamManager
 from utils.tree import IndexedTree
 
@@ -28,3 +31,51 @@ def test_populate(arkman: ArkSteamManager):
     assert 'A1' in tree['A']
     assert 'A2' in tree['A']
     assert 'B1' in tree['B']
+
+
+@pytest.mark.requires_game
+def test_populate_deep_chain_in_reverse(arkman: ArkSteamManager):
+    tree = IndexedTree('/')
+    relations = [(f'N{i + 1}', f'N{i}') for i in reversed(range(100))]
+    relations.append(('N0', '/'))
+
+    ark.discovery._populate_tree_from_relations(tree, relations)
+
+    assert tree['N100'].parent is tree['N99']
+    assert tree['N0'].parent is tree.root
+
+
+def test_file_relation_cache(tempdir: Path):
+    filename = tempdir / 'files'
+    relations: AssetRelations = ('/Game/A', [('/Game/A.A_C', '/Script/Engine.Actor')], None)
+
+    cache = FileRelationCache.load(filename)
+    assert cache.get('/Game/A', ('.uasset', 10, 1)) is None
+    cache.set(('.uasset', 10, 1), relations)
+    cache.set(('.uasset', 20, 1), ('/Game/B', [], None))
+    cache.save()
+
+    # Unchanged files are re-used, changed files are not
+    cache = FileRelationCache.load(filename)
+    assert cache.get('/Game/A', ('.uasset', 10, 1)) == relations
+    assert cache.get('/Game/B', ('.uasset', 20, 2)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.save()
+
+    # Entries not seen during the last scan are dropped
+    cache = FileRelationCache.load(filename)
+    assert cache.get('/Game/A', ('.uasset', 10, 1)) == relations
+    assert cache.get('/Game/B', ('.uasset', 20, 1)) is None
+
+
+def test_file_relation_cache_is_dropped_when_parser_changes(tempdir: Path, monkeypatch):
+    filename = tempdir / 'files'
+    relations: AssetRelations = ('/Game/A', [('/Game/A.A_C', '/Script/Engine.Actor')], None)
+
+    cache = FileRelationCache.load(filename)
+    cache.set(('.uasset', 10, 1), relations)
+    cache.save()
+
+    monkeypatch.setattr(ark.discovery, 'get_parser_version', lambda: 'changed')
+    cache = FileRelationCache.load(filename)
+    assert cache.get('/Game/A', ('.uasset', 10, 1)) is None
@@ -0,0 +1,141 @@
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional
+
+import pytest
+
+from ark.types import PDC_CLS
+from automate.ark import ArkSteamManager
+from automate.exporter import ExportManager, ExportRoot, ExportStage, StageExtraction
+from config import ConfigFile, get_global_config
+from ue.loader import AssetLoader, UsageBasedCacheManager
+from ue.proxy import UEProxyStructure
+
+from .common import *  # noqa: F401,F403  # needed to pick up all fixtures
+from .common import DODO_AB_CHR, DODO_CHR, FakeAsset, MockModResolver
+
+
+class RecordingExtraction(StageExtraction):
+
+    def __init__(self, type_name: str, filter=None):
+        self.type_name = type_name
+        self.filter = filter
+        self.added: List[str] = []
+        self.finished = False
+
+    def add(self, proxy: UEProxyStructure):
+        assert not self.finished
+        self.added.append(proxy.get_source().fullname)
+
+    def finish(self):
+        self.finished = True
+
+
+class FakeModResolver(MockModResolver):
+
+    def get_name_from_id(self, modid: str) -> Optional[str]:
+        return 'ModTest' if modid == '123' else None
+
+
+class FakeArkManager:
+
+    def __init__(self, loader: AssetLoader):
+        self.loader = loader
+
+    def getLoader(self) -> AssetLoader:
+        return self.loader
+
+    def getModData(self, modid: str) -> Optional[Dict[str, str]]:
+        return dict(id=modid, name='ModTest', title='Mod Test')
+
+
+class CachingStage(ExportStage):
+    '''Stands in for a stage that loads the mod's assets, noting which were still cached when it started.'''
+
+    def __init__(self, name: str, assetnames: List[str]):
+        self.name = name
+        self.assetnames = assetnames
+        self.found_cached: List[str] = []
+
+    def get_name(self) -> str:
+        return self.name
+
+    def extract_core(self, path: Path):
+        pass
+
+    def extract_mod(self, path: Path, modid: str):
+        cache = self.manager.loader.cache
+        self.found_cached = [name for name in self.assetnames if cache.lookup(name)]
+        for name in self.assetnames:
+            if name not in self.found_cached:
+                cache.add(name, FakeAsset(100))  # type: ignore
+
+
+class FakeRoot(ExportRoot):
+
+    def get_name(self) -> str:
+        return 'wiki'
+
+    def get_commit_header(self) -> Optional[str]:
+        return None
+
+    def get_name_for_path(self, path: PurePosixPath) -> Optional[str]:
+        return None
+
+
+# pylint: disable=protected-access,unused-argument
+
+
+@pytest.mark.parametrize('keep', [False, True])
+def test_mod_assets_kept_between_stages(monkeypatch, keep: bool):
+    config = get_global_config()
+    monkeypatch.setattr(config.optimisation, 'KeepModAssetsBetweenStages', keep)
+
+    # Room for just the core asset and the mod's two assets
+    cache = UsageBasedCacheManager(max_memory=300)
+    loader = AssetLoader(modresolver=FakeModResolver(), cache_manager=cache)
+    manager = ExportManager(FakeArkManager(loader), None, config)  # type: ignore
+    root = manager.add_root(FakeRoot())
+    mod_assets = ['/Game/Mods/ModTest/A', '/Game/Mods/ModTest/B']
+    first = CachingStage('first', mod_assets)
+    second = CachingStage('second', mod_assets)
+    root.stages = [first, second]
+    for stage in root.stages:
+        stage.initialise(manager, root)
+        stage.section_name = f'{root.get_name()}.{stage.get_name()}'
+
+    cache.add('/Game/Core', FakeAsset(100))  # type: ignore
+    manager._extract_stages('123')
+
+    # The second stage only finds the mod's assets already loaded if they were kept...
+    assert first.found_cached == []
+    assert second.found_cached == (mod_assets if keep else [])
+
+    # ...but they are released once the mod is done either way, leaving other assets alone
+    assert list(cache.cache) == ['/Game/Core']
+    assert cache.total_size == 100
+
+
+@pytest.mark.requires_game
+def test_shared_extraction_matches_separate_stages(arkman: ArkSteamManager, config: ConfigFile, dodos):
+    manager = ExportManager(arkman, None, config)  # type: ignore
+    manager.official_mod_prefixes = tuple()
+
+    everything = RecordingExtraction(PDC_CLS)
+    aberrant_only = RecordingExtraction(PDC_CLS, filter=lambda cls_name: 'Aberrant' in cls_name)
+    manager._perform_shared_extraction([everything, aberrant_only], None)
+
+    # Each extraction gets just what it would have been given if run alone
+    assert everything.added == [proxy.get_source().fullname for proxy in manager.iterate_core_exports_of_type(PDC_CLS)]
+    assert DODO_CHR in everything.added and DODO_AB_CHR in everything.added
+    assert DODO_AB_CHR in aberrant_only.added and DODO_CHR not in aberrant_only.added
+    assert everything.finished and aberrant_only.finished
+
+    # ...while classes wanted by both are only loaded once
+    loads = manager.loader.stats.loads
+    both = [RecordingExtraction(PDC_CLS), RecordingExtraction(PDC_CLS)]
+    manager._perform_shared_extraction(both, None)
+    shared_loads = manager.loader.stats.loads - loads
+
+    loads = manager.loader.stats.loads
+    manager._perform_shared_extraction([RecordingExtraction(PDC_CLS)], None)
+    assert manager.loader.stats.loads - loads == shared_loads
@@ -2,6 +2,7 @@ import pytest
 
 from ark.gathering import gather_dcsc_properties
 from ark.types import PrimalDinoCharacter, PrimalDinoStatusComponent, PrimalGameData
+from export.wiki.stage_species import OUTPUT_FLAGS
 from ue.gathering import gather_properties
 from ue.hierarchy import inherits_from
 from ue.proxy import UEProxyStructure
@@ -42,6 +43,25 @@ def test_gather_ab_dodo(scan_and_load):
     assert str(dodo_ab_chr.DescriptiveName[0]) == 'Aberrant Dodo'
 
 
+@pytest.mark.requires_game
+def test_gather_dodo_declared_only(scan_and_load):
+    dodo = scan_and_load(DODO_CHR)
+    full: PrimalDinoCharacter = gather_properties(dodo)
+    declared: PrimalDinoCharacter = gather_properties(dodo, declared_only=True)
+    assert str(declared.DescriptiveName[0]) == 'Dodo'
+
+    # Properties that are already parsed are never filtered
+    assert set(declared.get_all()) == set(full.get_all())
+    for name in declared.get_all():
+        assert {i: str(v) for i, v in declared[name].items()} == {i: str(v) for i, v in full[name].items()}
+
+
+def test_flags_read_by_name_are_declared():
+    # Undeclared fields would be skipped when gathering lazily parsed exports with `declared_only`
+    assert set(OUTPUT_FLAGS) <= PrimalDinoCharacter.get_field_names()
+    assert 'FertilizedEggWeightsToSpawn' in PrimalDinoCharacter.get_field_names()
+
+
 @pytest.mark.requires_game
 def test_gather_dodo_dcsc(scan_and_load):
     dodo = scan_and_load(DODO_CHR)
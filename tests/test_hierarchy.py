@@ -1,3 +1,5 @@
+from pathlib import Path
+
 import pytest
 
 import ue.hierarchy
@@ -71,3 +73,18 @@ def test_inherits_from(loader: AssetLoader, dodos):  # pylint: disable=unused-ar
 
     # Ab Dodo *class* does not inherit from itself
     assert not ue.hierarchy.inherits_from(dodo_ab_asset.default_class, DODO_AB_CHR)
+
+
+def test_hierarchy_snapshot(internal_hierarchy, tempdir: Path):  # pylint: disable=unused-argument
+    filename = tempdir / 'hierarchy.snapshot'
+    expected = list(ue.hierarchy.tree.frozen().data)
+    ue.hierarchy.save_snapshot(filename, 'key')
+
+    assert not ue.hierarchy.load_snapshot(tempdir / 'missing.snapshot', 'key')
+    assert not ue.hierarchy.load_snapshot(filename, 'other-key')
+
+    ue.hierarchy.tree.clear()
+    assert ue.hierarchy.load_snapshot(filename, 'key')
+    assert list(ue.hierarchy.tree.keys()) == expected
+    assert ue.hierarchy.get_parent_class(PRIMAL_CHR_CLS) == '/Script/Engine.Character'
+    assert ue.hierarchy.inherits_from(PRIMAL_CHR_CLS, '/Script/Engine.Actor')
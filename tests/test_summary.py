@@ -0,0 +1,33 @@
+import pytest
+
+import ue.hierarchy
+from ue.context import ue_parsing_context
+from ue.loader import AssetLoader
+
+from .common import *  # noqa: F401,F403  # needed to pick up all fixtures
+from .common import DODO_AB_CHR, DODO_CHR, TEST_PGD_PKG, TROODON_CHR
+
+ASSETS_TO_CHECK = (
+    DODO_CHR,
+    DODO_AB_CHR,
+    TROODON_CHR,
+    TEST_PGD_PKG,
+    '/Game/Maps/TheIslandSubmaps/TheIsland',
+)
+
+
+@pytest.mark.requires_game
+@pytest.mark.parametrize('name', ASSETS_TO_CHECK)
+def test_summary_matches_full_parse(loader: AssetLoader, name: str):
+    assetname = loader.clean_asset_name(name)
+
+    with ue_parsing_context(properties=False):
+        asset = loader.load_asset(assetname, use_cache=False, cache_result=False)
+    assert asset.file_ext
+    expected = [(export.fullname, ue.hierarchy._get_parent_cls(export))
+                for export in ue.hierarchy._find_exports_to_store(asset, asset.file_ext)]
+
+    summary = loader.load_asset_summary(assetname)
+    assert summary.file_ext == asset.file_ext
+    assert summary.names == [str(name) for name in asset.names]
+    assert list(summary.iterate_class_relations()) == expected
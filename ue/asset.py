@@ -1,14 +1,14 @@
 from __future__ import annotations
 
 import weakref
-from typing import TYPE_CHECKING, Optional, Set
+from typing import TYPE_CHECKING, AbstractSet, Dict, FrozenSet, Optional, Set, Tuple
 
 from utils.log import get_logger
 
 from .base import UEBase
 from .context import INCLUDE_METADATA, get_ctx
 from .coretypes import ChunkPtr, CompressedChunk, GenerationInfo, NameIndex, ObjectIndex, Table
-from .properties import Box, CustomVersion, EngineVersion, Guid, PropertyTable, StringProperty
+from .properties import Box, CustomVersion, DecodedTypeName, EngineVersion, Guid, PropertyTable, StringProperty
 from .stream import MemoryStream
 from .utils import get_clean_name
 
@@ -26,6 +26,9 @@ else:
 
 dbg_getName = 0
 
+# Rough average memory used by each parsed object, for estimating the size of an asset
+ESTIMATED_OBJECT_SIZE = 250
+
 __all__ = [
     'UAsset',
     'ImportTableItem',
@@ -53,6 +56,10 @@ class UAsset(UEBase):
         self.default_class: Optional['ExportTableItem'] = None
         self.has_properties = False
         self.has_bulk_data = False
+        self.lazy_properties = False
+        self.file_size = 0
+        self.object_count = 0
+        self.decoded_type_names: Dict[Tuple[int, int], DecodedTypeName] = dict()
         super().__init__(self, stream)
 
     def _deserialise(self):  # pylint: disable=arguments-differ
@@ -119,18 +126,44 @@ class UAsset(UEBase):
         self.imports.link()
         self.exports.link()
 
+        self._deserialise_context_data(self.stream)
+
+    def upgrade_to_context(self, mem: Optional[memoryview] = None):
+        '''
+        Deserialise any data required by the current context that is missing from this already-linked asset,
+        re-using the existing names, imports and exports.
+        `mem` must contain the same file the asset was originally parsed from. It is not required for assets with
+        lazy properties, as they retain their data.
+        '''
+        if not self.is_linked:
+            raise RuntimeError('Only linked assets can be upgraded')
+
+        self._deserialise_context_data(self.stream if mem is None else MemoryStream(mem, 0, len(mem)))
+
+    def can_upgrade_to_context(self) -> bool:
+        '''Check if missing context data can be added by `upgrade_to_context`, rather than a full re-parse.'''
+        return self.is_linked
+
+    def _deserialise_context_data(self, stream: MemoryStream):
         ctx = get_ctx()
 
-        if ctx.bulk_data:
+        if ctx.bulk_data and not self.has_bulk_data:
             # bulk_chunk = namedtuple('FakeChunkPtr', ['offset', 'count'])(self.bulk_data_start_offset, self.bulk_length)
             # self._newField('bulk', self._parseTable(bulk_chunk, PropertyTable))
             self.has_bulk_data = True
 
-        if ctx.properties:
-            for export in self.exports:
-                export.deserialise_properties()
+        if ctx.properties and not self.has_properties:
+            # Lazy exports deserialise their own properties when first accessed
+            if not self.lazy_properties:
+                for export in self.exports:
+                    export.deserialise_properties(stream)
             self.has_properties = True
 
+    @property
+    def estimated_size(self) -> int:
+        '''A rough estimate of the memory used by this asset, from its file size and the number of objects parsed.'''
+        return self.file_size + self.object_count * ESTIMATED_OBJECT_SIZE
+
     def is_context_satisfied(self, ctx):
         # Check that each of the context parameters is satisfied
         if not self.is_linked and ctx.link:
@@ -275,6 +308,7 @@ class ExportTableItem(UEBase):
     string_format = '{name} ({klass}) [{super}]'
     display_fields = ('name', 'namespace', 'klass', 'super')
     fullname: Optional[str] = None
+    _partial_properties: Optional[Dict[FrozenSet[str], PropertyTable]] = None
 
     klass: ObjectIndex
     super: ObjectIndex
@@ -293,11 +327,13 @@ class ExportTableItem(UEBase):
             self._newField('serial_size', self.stream.readUInt64()) # AQUATICA
             self._newField('serial_offset', self.stream.readUInt64()) # AQUATICA
         else:
-            self._newField('serial_size', self.stream.readUInt32())
-            self._newField('serial_offset', self.stream.readUInt32())
-        self._newField('force_export', self.stream.readBool32())
-        self._newField('not_for_client', self.stream.readBool32())
-        self._newField('not_for_server', self.stream.readBool32())
+            serial_size, serial_offset = self.stream.readUInt32Array(2)
+            self._newField('serial_size', serial_size)
+            self._newField('serial_offset', serial_offset)
+        force_export, not_for_client, not_for_server = self.stream.readUInt32Array(3)
+        self._newField('force_export', bool(force_export))
+        self._newField('not_for_client', bool(not_for_client))
+        self._newField('not_for_server', bool(not_for_server))
         self._newField('guid', Guid(self))
         self._newField('package_flags', self.stream.readUInt32())
         self._newField('not_for_editor_game', self.stream.readBool32())
@@ -315,12 +351,48 @@ class ExportTableItem(UEBase):
         if INCLUDE_METADATA:
             self.users.add(user)
 
-    def deserialise_properties(self):
+    def __getattr__(self, name: str):
+        # Properties of lazy assets are only deserialised when first accessed
+        if name == 'properties' and name not in self.field_values and self.asset.lazy_properties and self.asset.has_properties:
+            self.deserialise_properties()
+            return self.field_values['properties']
+
+        return super().__getattr__(name)
+
+    def get_properties(self, wanted: Optional[AbstractSet[str]] = None) -> PropertyTable:
+        '''
+        Get this export's properties.
+        If they are lazy and not yet deserialised, `wanted` limits parsing to only the named properties. Such partial
+        tables are kept separately and never stored as the export's `properties`.
+        '''
+        if wanted is None or 'properties' in self.field_values or not self.asset.lazy_properties:
+            return self.properties
+
+        if not self.asset.has_properties:
+            raise AttributeError('No field named "properties"')
+
+        key = frozenset(wanted)
+        if self._partial_properties is None:
+            self._partial_properties = dict()
+        table = self._partial_properties.get(key, None)
+        if table is None:
+            stream = MemoryStream(self.stream, self.serial_offset, self.serial_size)
+            table = PropertyTable(self, weakref.proxy(stream)).deserialise(key)
+            table.link()
+            self._partial_properties[key] = table
+
+        return table
+
+    def deserialise_properties(self, source: Optional[MemoryStream] = None):
+        '''
+        Deserialise this export's properties.
+        `source` can supply the asset's data when the stream it was originally parsed from is no longer available.
+        '''
         if 'properties' in self.field_values:
             raise RuntimeError('Attempt to deserialise properties more than once')
 
         # We deferred deserialising the properties until all imports/exports were defined
-        stream = MemoryStream(self.stream, self.serial_offset, self.serial_size)
+        stream = MemoryStream(source or self.stream, self.serial_offset, self.serial_size)
         self._newField('properties', PropertyTable(self, weakref.proxy(stream)))
         self.properties.link()
 
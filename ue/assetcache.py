@@ -0,0 +1,167 @@
+'''
+Persistent on-disk store of fully parsed assets, so unchanged files need not be parsed again on later runs.
+
+Each asset is pickled to its own file, keyed by the asset name, the size and modification time of its source file
+and a version derived from the parser's own source. Streams and the owning loader are not stored - they are replaced
+with an empty stream and the loading `AssetLoader` when an asset is restored.
+
+The same pickling is used for in-memory snapshots of assets, to pass parsed assets between processes.
+'''
+
+import hashlib
+import io
+import os
+import pickle
+import weakref
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+
+from utils.log import get_logger
+
+from .asset import UAsset
+from .context import INCLUDE_METADATA, get_ctx
+from .stream import MemoryStream
+
+if TYPE_CHECKING:
+    from .loader import AssetLoader
+
+__all__ = [
+    'PersistentAssetCache',
+    'dump_asset_snapshot',
+    'load_asset_snapshot',
+]
+
+logger = get_logger(__name__)
+
+PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+# Increment to invalidate all stored assets when the storage format changes
+PERSISTENT_CACHE_VERSION = 1
+
+CacheKey = Tuple[Any, ...]
+
+_parser_version: Optional[str] = None
+
+
+def get_parser_version() -> str:
+    '''A hash of the source of the parsing modules, so any change to the parser invalidates stored assets.'''
+    global _parser_version  # pylint: disable=global-statement
+    if _parser_version is None:
+        digest = hashlib.sha1(str(PERSISTENT_CACHE_VERSION).encode())
+        for filename in sorted(Path(__file__).parent.glob('*.py')):
+            if not filename.name.startswith('test'):
+                digest.update(filename.read_bytes())
+        _parser_version = digest.hexdigest()
+
+    return _parser_version
+
+
+def _no_loader():
+    return None
+
+
+class _AssetPickler(pickle.Pickler):
+    '''
+    Pickles an asset with empty streams in place of its data and no loader.
+
+    `reducer_override` is used rather than `persistent_id` as it is not called for the many plain ints and strings
+    within an asset, and the replacement streams are memoised like any other object.
+    '''
+
+    def __init__(self, file, loader: Optional['AssetLoader']):
+        super().__init__(file, protocol=PICKLE_PROTOCOL)
+        self.loader = loader
+
+    def reducer_override(self, obj):
+        # Streams may be weak proxies to streams that are already gone, so check their type before anything else
+        if type(obj) is weakref.ProxyType or isinstance(obj, MemoryStream):  # pylint: disable=unidiomatic-typecheck
+            return (MemoryStream, (b'', ))
+        if obj is not None and obj is self.loader:
+            return (_no_loader, ())
+        return NotImplemented
+
+
+def dump_asset_snapshot(asset: UAsset) -> bytes:
+    '''Pickle a parsed asset, without its stream or loader.'''
+    f = io.BytesIO()
+    _AssetPickler(f, asset.loader).dump(asset)
+    return f.getvalue()
+
+
+def load_asset_snapshot(data: bytes, loader: Optional['AssetLoader'] = None) -> UAsset:
+    '''Restore an asset pickled by `dump_asset_snapshot`, attaching it to the given loader.'''
+    asset = pickle.loads(data)
+    asset.loader = loader
+    return asset
+
+
+class PersistentAssetCache:
+    '''
+    Parsed assets stored on disk, one file per asset.
+
+    Only linked assets with their properties parsed are stored. An asset is only served if it still satisfies the
+    current parsing context.
+    '''
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, assetname: str, filename: Path, loader: Optional['AssetLoader'] = None) -> Optional[UAsset]:
+        '''Load the stored version of an asset, if there is one for the current version of its file.'''
+        key = self._make_key(assetname, filename)
+        cache_filename = self._get_cache_filename(assetname)
+        try:
+            with open(cache_filename, 'rb') as f:
+                if pickle.load(f) != key:
+                    self.misses += 1
+                    return None
+
+                asset = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:  # pylint: disable=broad-except
+            logger.warning('Stored asset %s could not be loaded and must be re-parsed', assetname, exc_info=True)
+            self.misses += 1
+            return None
+
+        if not isinstance(asset, UAsset) or not asset.is_context_satisfied(get_ctx()):
+            self.misses += 1
+            return None
+
+        asset.loader = loader
+
+        self.hits += 1
+        return asset
+
+    def save(self, asset: UAsset, filename: Path):
+        '''Store a parsed asset, keyed against the current version of the file it was parsed from.'''
+        assert asset.assetname
+        if not asset.is_linked or not asset.has_properties or asset.lazy_properties:
+            return
+
+        key = self._make_key(asset.assetname, filename)
+        cache_filename = self._get_cache_filename(asset.assetname)
+        temp_filename = cache_filename.with_name(cache_filename.name + '.tmp')
+        try:
+            cache_filename.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_filename, 'wb') as f:
+                pickle.dump(key, f, protocol=PICKLE_PROTOCOL)
+                _AssetPickler(f, asset.loader).dump(asset)
+            os.replace(temp_filename, cache_filename)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+            logger.debug('Unable to store parsed asset %s', asset.assetname, exc_info=True)
+            temp_filename.unlink(missing_ok=True)
+        except OSError:
+            logger.exception('Unable to store parsed asset %s', asset.assetname)
+            temp_filename.unlink(missing_ok=True)
+
+    def _make_key(self, assetname: str, filename: Path) -> CacheKey:
+        stat = os.stat(filename)
+        return (get_parser_version(), INCLUDE_METADATA, assetname, stat.st_size, stat.st_mtime_ns)
+
+    def _get_cache_filename(self, assetname: str) -> Path:
+        path = self.path.joinpath(*assetname.strip('/').split('/'))
+        return path.with_name(path.name + '.parsed')
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from .context import INCLUDE_METADATA, get_ctx
 from .stream import MemoryStream
@@ -14,23 +14,38 @@ else:
 
 
 class UEBase(object):
+    '''
+    Base of all parsed types.
+
+    Fields are normally held in the `field_values` dict and read through `__getattr__`. Types that are created
+    in very large numbers can instead list their fields in `__slots__`, storing them as plain attributes with no
+    per-instance dict. For these `field_values` and `field_order` are generated on demand from the slots.
+    '''
+    __slots__ = ('stream', 'asset', 'start_offset', 'end_offset', 'is_serialised', 'is_linked', 'is_inside_array', 'parent')
+
     main_field: Optional[str] = None
     string_format: Optional[str] = None
     display_fields: Optional[Sequence[str]] = None
     skip_level_field: Optional[str] = None
 
+    # Names of the fields stored in slots, in order - empty for dict-backed types
+    _field_slots: Tuple[str, ...] = ()
+
     def __init__(self, owner: "UEBase", stream=None):
         assert owner is not None, "Owner must be specified"
         self.stream: MemoryStream = stream or owner.stream
-        self.asset = owner.asset  # type: ignore
-        self.field_values: Dict[str, Any] = {}
+        asset = self.asset = owner.asset  # type: ignore
+        asset.object_count += 1
         self.start_offset: Optional[int] = None
         self.is_serialised = False
         self.is_linked = False
         self.is_inside_array = False
+        if not self._field_slots:
+            self.field_values: Dict[str, Any] = {}  # type: ignore
         if INCLUDE_METADATA:
             self.parent: Optional["UEBase"] = owner if owner is not owner.asset else None
-            self.field_order: List[str] = []
+            if not self._field_slots:
+                self.field_order: List[str] = []  # type: ignore
             self.end_offset: Optional[int] = None
 
     def __init_subclass__(cls, **kwargs):
@@ -40,6 +55,11 @@ class UEBase(object):
         if 'deserialise' in vars(cls):
             raise TypeError('Cannot override "deserialise"')
 
+        if vars(cls).get('__slots__'):
+            cls._field_slots = cls._field_slots + tuple(vars(cls)['__slots__'])
+            cls.field_values = property(_get_slotted_field_values)  # type: ignore
+            cls.field_order = property(_get_slotted_field_order)  # type: ignore
+
     def deserialise(self, *args, **kwargs):
         if self.is_serialised:
             raise RuntimeError(f'Deserialise called twice for "{self.__class__.__name__}"')
@@ -88,10 +108,12 @@ class UEBase(object):
         if name in self.field_values:
             raise NameError(f'Field "{name}" is already defined')
 
-        self.field_values[name] = value
-
-        if INCLUDE_METADATA:
-            self.field_order.append(name)
+        if self._field_slots:
+            setattr(self, name, value)
+        else:
+            self.field_values[name] = value
+            if INCLUDE_METADATA:
+                self.field_order.append(name)
 
         if isinstance(value, UEBase) and not value.is_serialised:
             value.deserialise(*extraArgs)
@@ -104,6 +126,10 @@ class UEBase(object):
 
     def __getattr__(self, name: str):
         '''Override property accessor to allow reading of defined fields.'''
+        # Fields are never dunder names - these are looked up during unpickling, before field_values exists
+        if self._field_slots or name.startswith('__'):
+            raise AttributeError(f'No field named "{name}"')
+
         try:
             return self.field_values[name]
         except KeyError:
@@ -115,7 +141,7 @@ class UEBase(object):
             return self.string_format.format(**self.field_values)
 
         if self.main_field:
-            return str(self.field_values.get(self.main_field, f'<uninitialised {self.__class__.__name__}>'))
+            return str(getattr(self, self.main_field, f'<uninitialised {self.__class__.__name__}>'))
 
         fields = self.display_fields or list(self.field_values.keys())
         fields_txt = ', '.join(str(self.field_values[name]) for name in fields)
@@ -152,3 +178,17 @@ class UEBase(object):
                         p.pretty(self.field_values[name])
                 else:
                     p.pretty(self.field_values[fields[0]])
+
+
+def _get_slotted_field_values(self: UEBase) -> Dict[str, Any]:
+    values = {}
+    for name in self._field_slots:
+        try:
+            values[name] = object.__getattribute__(self, name)
+        except AttributeError:
+            pass
+    return values
+
+
+def _get_slotted_field_order(self: UEBase) -> List[str]:
+    return list(_get_slotted_field_values(self))
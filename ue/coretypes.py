@@ -84,8 +84,9 @@ class ChunkPtr(UEBase):
     offset: int
 
     def _deserialise(self):
-        self._newField('count', self.stream.readUInt32())
-        self._newField('offset', self.stream.readUInt32())
+        count, offset = self.stream.readUInt32Array(2)
+        self._newField('count', count)
+        self._newField('offset', offset)
 
 
 class GenerationInfo(UEBase):
@@ -93,8 +94,9 @@ class GenerationInfo(UEBase):
     name_count: int
 
     def _deserialise(self):
-        self._newField('export_count', self.stream.readUInt32())
-        self._newField('name_count', self.stream.readUInt32())
+        export_count, name_count = self.stream.readUInt32Array(2)
+        self._newField('export_count', export_count)
+        self._newField('name_count', name_count)
 
 
 class CompressedChunk(UEBase):
@@ -104,13 +106,21 @@ class CompressedChunk(UEBase):
     compressed_size: int
 
     def _deserialise(self):
-        self._newField('uncompressed_offset', self.stream.readUInt32())
-        self._newField('uncompressed_size', self.stream.readUInt32())
-        self._newField('compressed_offset', self.stream.readUInt32())
-        self._newField('compressed_size', self.stream.readUInt32())
+        uncompressed_offset, uncompressed_size, compressed_offset, compressed_size = self.stream.readUInt32Array(4)
+        self._newField('uncompressed_offset', uncompressed_offset)
+        self._newField('uncompressed_size', uncompressed_size)
+        self._newField('compressed_offset', compressed_offset)
+        self._newField('compressed_size', compressed_size)
 
 
 class NameIndex(UEBase):
+    '''
+    A reference to an entry in the asset's name table.
+
+    Only the raw index is read. Without metadata the name is looked up the first time `value` is read after
+    linking, rather than during the link phase itself.
+    '''
+    __slots__ = ('index', 'instance', 'value')
     main_field = 'value'
 
     index: int
@@ -119,15 +129,25 @@ class NameIndex(UEBase):
 
     def _deserialise(self):
         # Get the index but don't look up the actual value until the link phase
-        self._newField('index', self.stream.readUInt32())
-        self._newField('instance', self.stream.readUInt32())
+        self.index, self.instance = self.stream.readUInt32Array(2)
 
     def _link(self):
-        self._newField('value', self.asset.getName(self.index))
         if INCLUDE_METADATA:
-            self.value.register_user(self.parent or self)
+            self._resolve()
+
+    def _resolve(self) -> Union[UEBase, str]:
+        value = self.asset.getName(self.index)
+        if INCLUDE_METADATA:
+            value.register_user(self.parent or self)
         if self.instance:
-            self.field_values['value'] = f'{self.value}_{self.instance - 1}'
+            value = f'{value}_{self.instance - 1}'
+        self.value = value
+        return value
+
+    def __getattr__(self, name: str):
+        if name == 'value' and self.is_linked:
+            return self._resolve()
+        return super().__getattr__(name)
 
     def format_for_json(self):
         return str(self)
@@ -140,57 +160,77 @@ class NameIndex(UEBase):
                 p.text(f'{cls}(<cyclic>)')
                 return
 
-            if 'value' in self.field_values:
+            if self.is_linked:
                 p.pretty(self.value)
             else:
                 p.text(f'{cls}(index={self.index})')
 
 
 class ObjectIndex(UEBase):
+    '''
+    A reference to an import (negative index) or export (positive index) of the asset.
+
+    Only the raw index is read. Without metadata the import or export is looked up the first time `value` is read
+    after linking, and is not told about its users.
+    '''
+    __slots__ = ('index', 'used_index', 'value')
     main_field = 'value'
     display_fields = ['index', 'value']
     skip_level_field = 'value'
 
     index: int
     used_index: int
-    kind: str
 
     def _deserialise(self):
         # Calculate the indexes but don't look up the actual import/export until the link phase
-        self._newField('index', self.stream.readInt32())  # object indexes are 32-bit and signed
-        if self.index < 0:
-            self.used_index = -self.index - 1
-            self.kind = 'import'
-        elif self.index > 0:
-            self.used_index = self.index - 1
-            self.kind = 'export'
+        index = self.stream.readInt32()  # object indexes are 32-bit and signed
+        self.index = index
+        if index < 0:
+            self.used_index = -index - 1
+        elif index > 0:
+            self.used_index = index - 1
         else:
             self.used_index = 0
-            self.kind = 'none'
 
-        self._newField('used_index', self.used_index)
+    @property
+    def kind(self) -> str:
+        if self.index < 0:
+            return 'import'
+        if self.index > 0:
+            return 'export'
+        return 'none'
 
     def _link(self):
+        if INCLUDE_METADATA:
+            self._resolve()
+
+    def _resolve(self):
         # Look up the import/export in the asset tables now they're completed
-        if self.kind == 'import':
+        if self.index < 0:
             source = self.asset.imports
-        elif self.kind == 'export':
+        elif self.index > 0:
             source = self.asset.exports
         else:
-            source = None
-            value = None
+            self.value = None
+            return None
 
-        if source:
-            if self.used_index >= len(source):
-                value = 'out_of_bounds_index_' + str(self.used_index)
-            else:
-                value = source[self.used_index]
+        if self.used_index >= len(source):
+            value = 'out_of_bounds_index_' + str(self.used_index)
+        else:
+            value = source[self.used_index]
+            if INCLUDE_METADATA:
                 value.register_user(self)
 
-        self._newField('value', value)
+        self.value = value
+        return value
+
+    def __getattr__(self, name: str):
+        if name == 'value' and self.is_linked:
+            return self._resolve()
+        return super().__getattr__(name)
 
     def format_for_json(self):
-        if self.kind == 'import':
+        if self.index < 0:
             return self.value
         else:
             return self.value and self.value.fullname
@@ -16,10 +16,14 @@ __all__ = [
 Tproxy = TypeVar('Tproxy', bound=UEProxyStructure)
 
 
-def gather_properties(export: Union[ExportTableItem, ObjectProperty, UAsset]) -> Tproxy:
-    '''Collect properties from an export, respecting the inheritance tree.'''
+def gather_properties(export: Union[ExportTableItem, ObjectProperty, UAsset], declared_only=False) -> Tproxy:
+    '''
+    Collect properties from an export, respecting the inheritance tree.
+    `declared_only` allows exports with lazy properties that are not yet parsed to parse only the fields declared
+    on the proxy. Exports whose properties are already parsed are gathered in full either way.
+    '''
     if isinstance(export, ObjectProperty):
-        return gather_properties(cast(ExportTableItem, export.value))
+        return gather_properties(cast(ExportTableItem, export.value), declared_only=declared_only)
 
     if isinstance(export, UAsset):
         export = getattr(export, 'default_class', None)  # type: ignore
@@ -38,6 +42,7 @@ def gather_properties(export: Union[ExportTableItem, ObjectProperty, UAsset]) ->
         raise TypeError(f"No proxy type available for {export.fullname}")
 
     proxy.set_source(export)
+    wanted = proxy.get_field_names() if declared_only else None
 
     # Now fill properties in, starting from the bottom-most baseclass
     done: Set[ExportTableItem] = set()
@@ -54,7 +59,7 @@ def gather_properties(export: Union[ExportTableItem, ObjectProperty, UAsset]) ->
             continue
         done.add(export_to_read)
 
-        props = export_to_read.properties.as_dict()
+        props = export_to_read.get_properties(wanted).as_dict()
         proxy.update(props)
 
     return proxy
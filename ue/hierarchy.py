@@ -1,3 +1,6 @@
+import struct
+import sys
+from array import array
 from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, Iterator, Optional, Union
@@ -9,7 +12,7 @@ from ue.context import ue_parsing_context
 from ue.loader import AssetLoader, AssetLoadException
 from ue.tree import get_parent_fullname
 from utils.log import get_logger
-from utils.tree import IndexedTree, Node
+from utils.tree import FrozenTree, IndexedTree, Node
 
 from .consts import BLUEPRINT_GENERATED_CLASS_CLS
 
@@ -23,6 +26,8 @@ __all__ = [
     'find_parent_classes',
     'get_parent_class',
     'load_internal_hierarchy',
+    'save_snapshot',
+    'load_snapshot',
     'explore_asset',
     'explore_path',
     'iterate_all',
@@ -32,6 +37,11 @@ logger = get_logger(__name__)
 
 ROOT_NAME = '/Script/CoreUObject.Object'
 
+# Snapshot file layout: header, key hash, newline-separated names in pre-order, then a little-endian int32 parent index per name
+SNAPSHOT_MAGIC = b'PHSN'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<4sIIII')  # magic, version, key length, names length, count
+
 
 @lru_cache(maxsize=1024)
 def _get_parent_cls(export: ExportTableItem) -> Optional[str]:
@@ -65,6 +75,14 @@ def inherits_from(klass: Union[str, ExportTableItem], target: str, safe=False, i
     `safe` as True will return False when encountering a HierarchyError.
     `include_self` to allow the case where the two inputs are equivalent.
     '''
+    # Classes already in the hierarchy can be checked directly against the frozen tree's index ranges
+    frozen = tree.frozen()
+    name = _name_from_argument(klass)
+    if name in frozen:
+        if target not in frozen:
+            return False
+        return frozen.is_descendant(name, target, include_self=include_self)
+
     if safe:
         try:
             return target in find_parent_classes(klass, include_self=include_self)
@@ -81,19 +99,13 @@ def find_sub_classes(klass: Union[str, ExportTableItem]) -> Iterator[str]:
     Iterate over all sub-classes of the given class.
     `klass` should be a full classname or an exported class.
     '''
-    if isinstance(klass, str):
-        name = klass
-    elif isinstance(klass, ExportTableItem):
-        assert klass.fullname
-        name = klass.fullname
-    else:
-        raise TypeError('Invalid argument')
+    name = _name_from_argument(klass)
 
-    node = tree.get(name, None)
-    if not node:
+    frozen = tree.frozen()
+    if name not in frozen:
         raise ValueError(f'Node {name} not found')
 
-    yield from (node.data for node in node.walk_iterator(skip_self=True))
+    yield from frozen.descendants(name)
 
 
 def find_parent_classes(klass: Union[str, ExportTableItem], *, include_self=False) -> Iterator[str]:
@@ -154,14 +166,17 @@ def iterate_all() -> Iterator[str]:
 NO_DEFAULT = object()
 
 
-def _node_from_argument(klass: Union[str, ExportTableItem], default=NO_DEFAULT) -> Node[str]:
+def _name_from_argument(klass: Union[str, ExportTableItem]) -> str:
     if isinstance(klass, str):
-        name = klass
-    elif isinstance(klass, ExportTableItem):
+        return klass
+    if isinstance(klass, ExportTableItem):
         assert klass.fullname
-        name = klass.fullname
-    else:
-        raise TypeError('Invalid argument')
+        return klass.fullname
+    raise TypeError('Invalid argument')
+
+
+def _node_from_argument(klass: Union[str, ExportTableItem], default=NO_DEFAULT) -> Node[str]:
+    name = _name_from_argument(klass)
 
     node = tree.get(name, None)
     if not node and default is NO_DEFAULT:
@@ -195,6 +210,66 @@ def load_internal_hierarchy(filename: Path):
     walk_hierarchy_yaml(ROOT_NAME, hierarchy_config[ROOT_NAME])
 
 
+def save_snapshot(filename: Path, key: str):
+    '''
+    Save the current hierarchy to a compact binary snapshot, for fast loading with `load_snapshot`.
+    `key` identifies the inputs the hierarchy was built from.
+    '''
+    frozen = tree.frozen()
+    key_bytes = key.encode('utf8')
+    names = '\n'.join(frozen.data).encode('utf8')
+    parents = array('i', frozen.parents)
+    if sys.byteorder == 'big':
+        parents.byteswap()
+
+    with open(filename, 'wb') as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(key_bytes), len(names), len(frozen)))
+        f.write(key_bytes)
+        f.write(names)
+        f.write(parents.tobytes())
+
+
+def load_snapshot(filename: Path, key: str) -> bool:
+    '''
+    Replace the hierarchy with one saved by `save_snapshot`.
+    Returns False, leaving the hierarchy untouched, if the snapshot is missing, invalid or has a different key.
+    '''
+    try:
+        with open(filename, 'rb') as f:
+            data = f.read()
+    except IOError:
+        logger.debug('Hierarchy snapshot %s could not be loaded', filename)
+        return False
+
+    if len(data) < SNAPSHOT_HEADER.size:
+        return False
+    magic, version, key_len, names_len, count = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        logger.debug('Hierarchy snapshot %s has an unsupported format', filename)
+        return False
+
+    offset = SNAPSHOT_HEADER.size
+    if data[offset:offset + key_len] != key.encode('utf8'):
+        logger.debug('Hierarchy snapshot %s key did not match', filename)
+        return False
+    offset += key_len
+
+    names = data[offset:offset + names_len].decode('utf8').split('\n')
+    offset += names_len
+
+    parents = array('i')
+    parents.frombytes(data[offset:offset + count * parents.itemsize])
+    if sys.byteorder == 'big':
+        parents.byteswap()
+
+    if len(names) != count or len(parents) != count:
+        logger.warning('Hierarchy snapshot %s is truncated and will be ignored', filename)
+        return False
+
+    tree.restore(FrozenTree[str](names, parents))
+    return True
+
+
 def explore_asset(assetname: str, loader: AssetLoader):
     asset = loader[assetname]
     assert asset.file_ext
@@ -1,20 +1,27 @@
+import mmap
 import os.path
 import re
+import time
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from configparser import ConfigParser
 from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Set, Tuple, Union
+from typing import Deque, Dict, Generic, Iterable, Iterator, List, Optional, Pattern, Set, Tuple, TypeVar, Union
 
 import psutil  # type: ignore
 
 from utils.log import get_logger
 
 from .asset import ExportTableItem, ImportTableItem, UAsset
+from .assetcache import PersistentAssetCache, dump_asset_snapshot, load_asset_snapshot
 from .base import UEBase
-from .context import get_ctx
+from .context import INCLUDE_METADATA, get_ctx, ue_parsing_context
+from .pathindex import PathIndex
 from .properties import ObjectProperty, Property
 from .stream import MemoryStream
+from .summary import AssetSummary, read_asset_summary
 
 logger = get_logger(__name__)
 
@@ -25,12 +32,17 @@ __all__ = (
     'AssetParseError',
     'AssetLoader',
     'load_file_into_memory',
+    'release_file_memory',
+    'load_asset_summary_from_file',
     'ModResolver',
     'IniModResolver',
 )
 
 NO_FALLBACK = object()
 
+# Result type of a ReadAheadService
+Tresult = TypeVar('Tresult')
+
 
 class AssetLoadException(Exception):
     pass
@@ -123,6 +135,10 @@ class CacheManager(ABC):
     def get_count(self):
         raise NotImplementedError
 
+    def contains(self, name: str) -> bool:
+        '''Check if an asset is cached, without marking it as used.'''
+        return False
+
 
 class DictCacheManager(CacheManager):
     '''A cache manager implementing the old unintelligent mechanism.'''
@@ -149,22 +165,27 @@ class DictCacheManager(CacheManager):
     def get_count(self):
         return len(self.cache)
 
+    def contains(self, name: str) -> bool:
+        return name in self.cache
+
 
 class UsageBasedCacheManager(CacheManager):
     '''
     A cache manager that prioritises the most recently used entries.
 
     We use the guaranteed ordering of Python dicts to track the most recently used entries.
+    The least recently used entries are dropped when either the number of assets or their total estimated size
+    (see `UAsset.estimated_size`) goes over its limit.
     '''
 
     def __init__(self, max_count=3000, max_memory=6 * 1024 * 1024 * 1024, keep_count=500):
         self.cache: Dict[str, UAsset] = dict()
+        self.sizes: Dict[str, int] = dict()
+        self.total_size = 0
         self.max_count = max_count
         self.max_memory = max_memory
         self.keep_count = keep_count
 
-        self.highest_memory_seen = 0
-
     def lookup(self, name: str):
         '''
         Lookup an asset in the cache.
@@ -177,6 +198,9 @@ class UsageBasedCacheManager(CacheManager):
             # Re-insert at the end
             self.cache[name] = result
 
+            # Assets can grow after being cached, e.g. when lazy properties are parsed
+            self._update_size(name, result)
+
         return result
 
     def add(self, name: str, asset: UAsset):
@@ -190,6 +214,7 @@ class UsageBasedCacheManager(CacheManager):
 
         # Add to the end of the cache
         self.cache[name] = asset
+        self._update_size(name, asset)
 
         # Check if we have too many assets
         self._maybe_purge()
@@ -202,6 +227,8 @@ class UsageBasedCacheManager(CacheManager):
         found = self.cache.pop(name, None)
         if not found:
             logger.warning('Attempt to remove asset that was not found: %s', name)
+        else:
+            self.total_size -= self.sizes.pop(name)
 
     def wipe(self, prefix: str = ''):
         '''
@@ -213,33 +240,107 @@ class UsageBasedCacheManager(CacheManager):
             logger.debug('Wiping cache completely')
             # Full wipe
             self.cache = dict()
+            self.sizes = dict()
+            self.total_size = 0
         else:
             logger.debug('Wiping cache with prefix: %s', prefix)
             to_cull = list(key for key in self.cache if key.startswith(prefix))
-            for name in to_cull:
-                del self.cache[name]
+            self._cull(to_cull)
 
     def get_count(self):
         return len(self.cache)
 
-    def _maybe_purge(self):
-        mem_used = psutil.Process().memory_info().rss
-        if mem_used > self.highest_memory_seen:
-            self.highest_memory_seen = mem_used
+    def contains(self, name: str) -> bool:
+        return name in self.cache
+
+    def _update_size(self, name: str, asset: UAsset):
+        size = asset.estimated_size
+        self.total_size += size - self.sizes.get(name, 0)
+        self.sizes[name] = size
 
+    def _maybe_purge(self):
         cache_count = len(self.cache)
 
         if cache_count >= self.max_count:
             logger.debug("Asset cache purge due to too many items")
             self._purge(cache_count - self.keep_count)
-        # elif mem_used >= self.max_memory and cache_count > self.keep_count:
-        #     logger.info("Asset cache purge due to high memory usage (with %d items)", cache_count)
-        #     self._purge(cache_count - self.keep_count)
+
+        if self.total_size > self.max_memory and cache_count > 1:
+            logger.debug("Asset cache purge due to estimated size (%d bytes in %d items)", self.total_size, cache_count)
+            self._purge_to_size(self.max_memory)
 
     def _purge(self, amount: int):
-        to_cull = list(islice(self.cache, amount))
-        for name in to_cull:
+        self._cull(list(islice(self.cache, amount)))
+
+    def _purge_to_size(self, max_size: int):
+        '''Remove the least recently used entries until the total estimated size fits, always keeping the newest.'''
+        to_cull = []
+        remaining = self.total_size
+        for name in islice(self.cache, len(self.cache) - 1):
+            if remaining <= max_size:
+                break
+            remaining -= self.sizes[name]
+            to_cull.append(name)
+
+        self._cull(to_cull)
+
+    def _cull(self, names: Iterable[str]):
+        for name in names:
             del self.cache[name]
+            self.total_size -= self.sizes.pop(name)
+
+
+class LoaderStats:
+    '''
+    Counters describing the work done by an `AssetLoader`.
+
+    Reading the process's memory use is a system call, so it is only sampled at most once every
+    `memory_sample_interval` seconds rather than on every load.
+    '''
+
+    def __init__(self, memory_sample_interval: float = 1.0):
+        self.memory_sample_interval = memory_sample_interval
+        self.next_memory_sample = 0.0
+
+        self.loads = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.assets_parsed = 0
+        self.assets_upgraded = 0
+        self.assets_from_workers = 0
+        self.parse_time = 0.0
+        self.bytes_read = 0
+        self.max_memory = 0
+        self.max_cache = 0
+
+    def record_load(self, cache_hit: bool, cache_count: int):
+        self.loads += 1
+        if cache_hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+
+        if cache_count > self.max_cache:
+            self.max_cache = cache_count
+
+        if time.monotonic() >= self.next_memory_sample:
+            self.sample_memory()
+
+    def record_parse(self, size: int, duration: float, upgrade=False):
+        if upgrade:
+            self.assets_upgraded += 1
+        else:
+            self.assets_parsed += 1
+        self.bytes_read += size
+        self.parse_time += duration
+
+    def sample_memory(self) -> int:
+        '''Measure the current memory use of the process, updating the maximum seen.'''
+        self.next_memory_sample = time.monotonic() + self.memory_sample_interval
+        mem_used = psutil.Process().memory_info().rss
+        if mem_used > self.max_memory:
+            self.max_memory = mem_used
+        return mem_used
 
 
 class ContextAwareCacheWrapper(CacheManager):
@@ -254,11 +355,21 @@ class ContextAwareCacheWrapper(CacheManager):
             return None
 
         # Ensure the found asset satisfies the requirements of the current parsing context
-        if not asset.is_context_satisfied(current_ctx):
-            logger.debug("Re-parsing asset for more data: %s", name)
-            return None
+        if asset.is_context_satisfied(current_ctx):
+            return asset
 
-        return asset
+        # Add the missing data to the existing asset where possible, else have it re-parsed
+        if asset.loader and asset.can_upgrade_to_context():
+            logger.debug("Upgrading cached asset for more data: %s", name)
+            try:
+                asset.loader.upgrade_asset(asset)
+            except AssetLoadException:
+                self.manager.remove(name)
+                raise
+            return asset
+
+        logger.debug("Re-parsing asset for more data: %s", name)
+        return None
 
     def add(self, name: str, asset: UAsset):
         return self.manager.add(name, asset)
@@ -272,6 +383,206 @@ class ContextAwareCacheWrapper(CacheManager):
     def get_count(self):
         return self.manager.get_count()
 
+    def contains(self, name: str) -> bool:
+        return self.manager.contains(name)
+
+
+class PrefetchQueue:
+    '''Assets queued by one caller in the order they will be loaded, and the results being fetched ahead for them.'''
+
+    def __init__(self, assetnames: Iterable[str]):
+        self.names: Deque[str] = deque(assetnames)
+        self.pending: Dict[str, Future] = dict()
+
+
+class ReadAheadService(ABC, Generic[Tresult]):
+    '''
+    Base for services that work on upcoming assets in the background, ahead of them being loaded.
+
+    Each caller queues assets in the order it will load them, releases each once it is done with it, and cancels
+    only its own queue when done. Queues added while another is in use, such as by nested iterations, are served
+    first. At most `max_count` assets are worked on at a time, and no more are started while the results waiting to
+    be used total more than `max_memory` bytes.
+    '''
+
+    def __init__(self, loader: 'AssetLoader', max_count: int, max_memory: int):
+        self.loader = loader
+        self.max_count = max_count
+        self.max_memory = max_memory
+        self.queues: List[PrefetchQueue] = []
+        self.executor: Optional[Executor] = None
+
+    def add(self, assetnames: Iterable[str]) -> PrefetchQueue:
+        '''Queue assets to be read, in the order they will be loaded. Returns the queue, to be passed to `cancel`.'''
+        queue = PrefetchQueue(assetnames)
+        self.queues.append(queue)
+        self._fill()
+        return queue
+
+    def cancel(self, queue: Optional[PrefetchQueue] = None):
+        '''Drop the given queue and any data already read for it, or all queues if none is given.'''
+        for cancelled in [queue] if queue else list(self.queues):
+            if cancelled in self.queues:
+                self.queues.remove(cancelled)
+            cancelled.names.clear()
+            for future in cancelled.pending.values():
+                self._discard(future)
+            cancelled.pending = dict()
+
+        self._fill()
+
+    def close(self):
+        '''Drop all queues and shut down the background workers. They are started again if more work is queued.'''
+        self.cancel()
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def take(self, assetname: str) -> Optional[Tresult]:
+        '''
+        Get the result fetched ahead for an asset, if there is any.
+        Only the asset itself is taken, as it may be loaded out of order (e.g. as a parent of another asset).
+        '''
+        for queue in reversed(self.queues):
+            future = queue.pending.pop(assetname, None)
+            if future:
+                self._fill()
+                return self._get_result(assetname, future)
+
+        return None
+
+    def release(self, queue: PrefetchQueue, assetname: str):
+        '''
+        Tell the service a caller is done with an asset from its queue.
+        Any result still waiting for it was not used, e.g. because the asset came from a cache, so is dropped.
+        '''
+        future = queue.pending.pop(self.loader.clean_asset_name(assetname), None)
+        if future:
+            self._discard(future)
+            self._fill()
+
+    def _fill(self):
+        for queue in reversed(self.queues):
+            while queue.names and self._get_pending_count() < self.max_count and self._get_waiting_size() < self.max_memory:
+                try:
+                    assetname = self.loader.clean_asset_name(queue.names.popleft())
+                    if self._is_pending(assetname) or self.loader.cache.contains(assetname):
+                        continue
+
+                    path, ext = self.loader.find_asset_file(assetname)
+                except AssetLoadException:
+                    continue
+
+                queue.pending[assetname] = self._submit(assetname, path, ext)
+
+    def _is_pending(self, assetname: str) -> bool:
+        return any(assetname in queue.pending for queue in self.queues)
+
+    def _get_pending_count(self) -> int:
+        return sum(len(queue.pending) for queue in self.queues)
+
+    def _get_waiting_size(self) -> int:
+        return sum(
+            len(future.result()) for queue in self.queues for future in queue.pending.values()
+            if future.done() and not future.exception())
+
+    def _discard(self, future: Future):
+        if not future.cancel():
+            future.add_done_callback(self._release)
+
+    @abstractmethod
+    def _submit(self, assetname: str, path: Path, ext: str) -> Future:
+        ...
+
+    @abstractmethod
+    def _get_result(self, assetname: str, future: Future) -> Optional[Tresult]:
+        ...
+
+    @abstractmethod
+    def _release(self, future: Future):
+        '''Free the result of a discarded future, once it completes.'''
+        ...
+
+
+class AssetPrefetcher(ReadAheadService[memoryview]):
+    '''Reads the files of upcoming assets on background threads, so that file I/O overlaps with parsing.'''
+
+    def __init__(self, loader: 'AssetLoader', max_count: int, max_memory: int, max_threads: int = 4):
+        super().__init__(loader, max_count, max_memory)
+        self.max_threads = max_threads
+
+    def _submit(self, assetname: str, path: Path, ext: str) -> Future:
+        if not self.executor:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix='asset-prefetch')
+        return self.executor.submit(load_file_into_memory, path)
+
+    def _get_result(self, assetname: str, future: Future) -> Optional[memoryview]:
+        try:
+            return future.result()
+        except OSError:
+            # Let the normal load report the problem
+            return None
+
+    def _release(self, future: Future):
+        if not future.exception():
+            release_file_memory(future.result())
+
+
+class ParseService(ReadAheadService[UAsset]):
+    '''
+    Parses upcoming assets in worker processes, as parsing is CPU-bound and gains nothing from threads.
+
+    Each worker returns a pickled snapshot of the fully parsed asset, which is restored and attached to the loader
+    when the asset is loaded. Restoring a snapshot is much quicker than parsing, so most of the work is spread
+    over the workers. Assets that fail in a worker are simply parsed again as normal, to report the error.
+
+    The worker processes are started with the first queue and kept for later ones, as starting them is slow. Cancelling
+    a queue only drops its queued work. Call `close` (via `AssetLoader.close`) to shut the workers down.
+    '''
+
+    def __init__(self, loader: 'AssetLoader', processes: int, max_memory: int):
+        super().__init__(loader, processes * 2, max_memory)
+        self.processes = processes
+
+    def _submit(self, assetname: str, path: Path, ext: str) -> Future:
+        if not self.executor:
+            self.executor = ProcessPoolExecutor(max_workers=self.processes)
+        ctx = get_ctx()
+        return self.executor.submit(_parse_asset_in_worker, assetname, str(path), ext, INCLUDE_METADATA, ctx.link,
+                                    ctx.properties, ctx.bulk_data)
+
+    def _get_result(self, assetname: str, future: Future) -> Optional[UAsset]:
+        try:
+            asset = load_asset_snapshot(future.result(), self.loader)
+        except Exception:  # pylint: disable=broad-except
+            logger.debug('Asset could not be parsed by a worker: %s', assetname, exc_info=True)
+            return None
+
+        # The asset was parsed in the context it was queued in, which may no longer be enough
+        if not asset.is_context_satisfied(get_ctx()):
+            return None
+
+        return asset
+
+    def _release(self, future: Future):
+        pass
+
+
+def _parse_asset_in_worker(assetname: str, filename: str, ext: str, include_metadata: bool, link: bool, properties: bool,
+                           bulk_data: bool) -> bytes:
+    '''Worker process entry point, parsing an asset and returning a snapshot of it.'''
+    if include_metadata != INCLUDE_METADATA:
+        raise RuntimeError('Parse workers must be started with the same metadata setting as the main process')
+
+    with ue_parsing_context(link=link, properties=properties, bulk_data=bulk_data):
+        mem = load_file_into_memory(filename)
+        try:
+            asset = parse_asset(mem, assetname, ext)
+        finally:
+            mem.release()
+
+    return dump_asset_snapshot(asset)
+
 
 class AssetLoader:
 
@@ -281,7 +592,13 @@ class AssetLoader:
                  assetpath='.',
                  cache_manager: CacheManager = None,
                  rewrites: Dict[str, str] = dict(),
-                 mod_aliases: Dict[str, Set[str]] = dict()):
+                 mod_aliases: Dict[str, Set[str]] = dict(),
+                 use_mmap: bool = False,
+                 lazy_properties: bool = False,
+                 persistent_cache_path: Optional[Path] = None,
+                 prefetch_count: int = 0,
+                 prefetch_memory: int = 256 * 1024 * 1024,
+                 parse_processes: int = 0):
         self.cache: CacheManager = cache_manager or ContextAwareCacheWrapper(UsageBasedCacheManager())
         self.asset_path = Path(assetpath)
         self.absolute_asset_path = self.asset_path.absolute().resolve()  # need both absolute and resolve here
@@ -289,14 +606,29 @@ class AssetLoader:
         self.modresolver.initialise()
         self.rewrites_to_path = rewrites
         self.rewrites_to_asset = {v: k for k, v in rewrites.items()}
+        self.path_index = PathIndex(self.asset_path)
         self.mod_to_aliases = mod_aliases
         self.alias_to_mods: Dict[str, str] = dict()
         for mod_tag, aliases in mod_aliases.items():
             for alias in aliases:
                 self.alias_to_mods[alias] = mod_tag
 
-        self.max_memory = 0
-        self.max_cache = 0
+        # Map asset files into memory instead of reading them onto the heap
+        self.use_mmap = use_mmap
+
+        # Keep each asset's data in memory so export properties can be parsed on first access
+        self.lazy_properties = lazy_properties
+
+        # Store parsed assets on disk and re-use them in later runs while their files are unchanged
+        self.persistent_cache = PersistentAssetCache(persistent_cache_path) if persistent_cache_path else None
+
+        # Read the files of assets that are about to be loaded in the background
+        self.prefetcher = AssetPrefetcher(self, prefetch_count, prefetch_memory) if prefetch_count > 0 else None
+
+        # Parse assets that are about to be loaded in worker processes, in place of prefetching
+        self.parse_service = ParseService(self, parse_processes, prefetch_memory) if parse_processes > 0 else None
+
+        self.stats = LoaderStats()
 
     def clean_asset_name(self, name: str) -> str:
         # Remove class name, if present
@@ -328,8 +660,20 @@ class AssetLoader:
     def wipe_cache_with_prefix(self, prefix: str) -> None:
         self.cache.wipe(prefix)
 
+    def invalidate_path_index(self) -> None:
+        '''Forget the files seen so far, so that newly installed or removed assets are noticed.'''
+        self.path_index.clear()
+
     def convert_asset_name_to_path(self, name: str, partial=False, ext='.uasset', check_exists=True) -> Optional[Path]:
         '''Get the filename from which an asset can be loaded.'''
+        parts = self._convert_asset_name_to_parts(name, partial=partial, ext=ext)
+        if not check_exists:
+            return Path(self.asset_path, *parts)
+
+        # Find the file or directory, matching case-insensitively
+        return self.path_index.find(*parts, is_dir=partial)
+
+    def _convert_asset_name_to_parts(self, name: str, partial=False, ext='.uasset') -> List[str]:
         name = self.clean_asset_name(name)
 
         # Handle any asset path rewrites
@@ -354,20 +698,7 @@ class AssetLoader:
         if not partial:
             parts[-1] += ext
 
-        # Check and return if it exists as-is
-        fullpath = Path(self.asset_path, *parts)
-        if not check_exists:
-            return fullpath
-
-        if partial and fullpath.is_dir():
-            return fullpath
-        if not partial and fullpath.is_file():
-            return fullpath
-
-        # Check for case-insensitive match
-        foundPath = find_caseinsensitive_path(self.asset_path, *parts)
-
-        return foundPath
+        return parts
 
     def get_mod_name(self, assetname: str) -> Optional[str]:
         assert assetname is not None
@@ -406,45 +737,80 @@ class AssetLoader:
                         extension: Union[str, Iterable[str]] = '.uasset',
                         return_extension=False,
                         invert=False):
+        '''
+        Yield the name of each asset within `toppath`, filtered by regexes matched against the start of the name.
+        Assets matching an `include` are always returned, otherwise those matching an `exclude` are skipped.
+        With `invert` only the skipped assets are returned.
 
+        Directories are listed through the loader's path index, so repeated searches do not touch the disk again.
+        '''
         includes: Tuple[str, ...] = tuple(include, ) if isinstance(include, str) else tuple(include or ())
         excludes: Tuple[str, ...] = tuple(exclude, ) if isinstance(exclude, str) else tuple(exclude or ())
         extensions: Tuple[str, ...] = tuple((extension, )) if isinstance(extension, str) else tuple(extension or ())
         extensions = tuple(ext.lower() for ext in extensions)
         assert extensions
 
-        toppath = self.convert_asset_name_to_path(toppath, partial=True)
-        for path, _, files in os.walk(toppath):
+        name_filter = AssetNameFilter(includes, excludes)
+
+        topparts = self._convert_asset_name_to_parts(toppath, partial=True)
+        for path, dirnames, files in self.path_index.walk(*topparts):
+            prefix = self._get_assetname_prefix(path)
+
+            # Don't descend into directories where every asset would be skipped
+            if not invert and name_filter.can_exclude_directories:
+                dirnames[:] = [
+                    name for name in dirnames
+                    if not name_filter.excludes_all_within(self._get_assetname_prefix(path + '/' + name))
+                ]
+
             for filename in files:
-                fullpath = os.path.join(path, filename)
-                name, ext = os.path.splitext(fullpath)
+                name, ext = os.path.splitext(filename)
 
                 if ext.lower() not in extensions:
                     continue
 
-                partialpath = str(Path(fullpath).relative_to(self.asset_path).with_suffix(''))
-                assetname = self.clean_asset_name(partialpath)
+                if prefix and _is_plain_asset_leafname(name):
+                    assetname = prefix + name
+                else:
+                    assetname = self._convert_path_to_assetname(path + '/' + name)
 
-                # Handle any asset path rewrites
-                for prefix_from, prefix_to in self.rewrites_to_asset.items():
-                    if assetname.startswith(prefix_from):
-                        assetname = prefix_to + assetname[len(prefix_from):]
-                        break
+                # Yield or skip this entry (force bool because xor behaves differently with non-bools)
+                if name_filter.matches(assetname) ^ bool(invert):
+                    yield (assetname, ext) if return_extension else assetname
 
-                result = (assetname, ext) if return_extension else assetname
+    def _convert_path_to_assetname(self, relpath: str) -> str:
+        assetname = self.clean_asset_name(relpath)
 
-                # Apply filtering, starting with forced inclusions
-                matched = True
-                if any(re.match(include, assetname) for include in includes):
-                    # ...skip the exclusion test
-                    pass
-                # Then handle exclusions with a lower priority
-                elif any(re.match(exclude, assetname) for exclude in excludes):
-                    matched = False
+        # Handle any asset path rewrites
+        for prefix_from, prefix_to in self.rewrites_to_asset.items():
+            if assetname.startswith(prefix_from):
+                return prefix_to + assetname[len(prefix_from):]
 
-                # Yield or skip this entry (force bool because xor behaves differently with non-bools)
-                if matched ^ bool(invert):
-                    yield result
+        return assetname
+
+    def _get_assetname_prefix(self, relpath: str) -> Optional[str]:
+        '''
+        Get the asset name prefix (ending in /) shared by the assets directly within the given directory,
+        or None if each asset's name must be converted from its path separately.
+        '''
+        try:
+            prefix = self.clean_asset_name(relpath + '/_')
+        except ModNotFound:
+            return None
+
+        # Names are cut at the first dot, so a dot in the directory name changes every asset name
+        if not prefix.endswith('/_'):
+            return None
+        prefix = prefix[:-1]
+
+        for prefix_from, prefix_to in self.rewrites_to_asset.items():
+            if prefix.startswith(prefix_from):
+                return prefix_to + prefix[len(prefix_from):]
+            if prefix_from.startswith(prefix):
+                # Only some assets in this directory are rewritten
+                return None
+
+        return prefix
 
     def load_related(self, obj: UEBase) -> UAsset:
         if isinstance(obj, Property):
@@ -477,42 +843,121 @@ class AssetLoader:
         if not os.path.isabs(filename):
             filename = os.path.join(self.asset_path, filename)
         try:
-            mem = load_file_into_memory(filename)
+            mem = load_file_into_memory(filename, use_mmap=self.use_mmap)
         except FileNotFoundError:
             raise AssetNotFound(filename)
         return mem
 
-    def load_raw_asset(self, name: str) -> Tuple[memoryview, str]:
+    def find_asset_file(self, name: str) -> Tuple[Path, str]:
         '''
-        Load an asset given its asset name into memory without parsing it.
-        Returns (memoryview, ext).
+        Find the file an asset would be loaded from.
+        Returns (path, ext).
         '''
         name = self.clean_asset_name(name)
-        mem = None
         for ext in ('.uasset', '.umap'):
             path = self.convert_asset_name_to_path(name, ext=ext)
-            if path and path.is_file():
-                mem = load_file_into_memory(path)
-                return (mem, ext)
+            if path:
+                return (path, ext)
 
         raise AssetNotFound(name)
 
+    def load_raw_asset(self, name: str) -> Tuple[memoryview, str]:
+        '''
+        Load an asset given its asset name into memory without parsing it.
+        Returns (memoryview, ext).
+        '''
+        path, ext = self.find_asset_file(name)
+        mem = load_file_into_memory(path, use_mmap=self.use_mmap)
+        return (mem, ext)
+
+    def load_asset_summary(self, assetname: str, quiet=False) -> AssetSummary:
+        '''
+        Read only the name, import and export tables of an asset, enough to discover its place in the hierarchy.
+        The result is not cached and no UEBase objects are created.
+        '''
+        assetname = self.clean_asset_name(assetname)
+        if not quiet:
+            logger.debug("Loading asset summary: %s", assetname)
+        path, ext = self.find_asset_file(assetname)
+        return load_asset_summary_from_file(path, assetname, ext, use_mmap=self.use_mmap)
+
+    def upgrade_asset(self, asset: UAsset):
+        '''
+        Parse any data required by the current context that is missing from an already loaded asset.
+        Only the file is re-read - the asset's existing tables are re-used.
+        '''
+        assert asset.assetname
+        if asset.lazy_properties:
+            # The asset's data was retained, so there is no need to re-read the file
+            asset.upgrade_to_context()
+            return
+
+        mem, _ = self.load_raw_asset(asset.assetname)
+        start_time = time.perf_counter()
+        try:
+            asset.upgrade_to_context(mem)
+        except Exception as ex:
+            raise AssetParseError(asset.assetname) from ex
+        finally:
+            self.stats.record_parse(len(mem), time.perf_counter() - start_time, upgrade=True)
+            release_file_memory(mem)
+
     def load_asset(self, assetname: str, quiet=False, use_cache=True, cache_result=True) -> UAsset:
         '''Load and parse the given asset, or fetch it from the cache if already loaded.'''
         assetname = self.clean_asset_name(assetname)
-        asset = (use_cache and self.cache.lookup(assetname)) or \
-            self._load_asset(assetname, quiet=quiet, cache_result=cache_result)
+        asset = use_cache and self.cache.lookup(assetname)
+        cache_hit = bool(asset)
+        if not asset:
+            asset = self._load_asset(assetname, quiet=quiet, cache_result=cache_result)
 
-        # Keep track of some stats
-        mem_used = psutil.Process().memory_info().rss
-        if mem_used > self.max_memory:
-            self.max_memory = mem_used
-        cache_used = self.cache.get_count()
-        if cache_used > self.max_cache:
-            self.max_cache = cache_used
+        self.stats.record_load(cache_hit, self.cache.get_count())
 
         return asset
 
+    def load_many(self, assetnames: Iterable[str], quiet=False) -> Iterator[UAsset]:
+        '''Load each of the given assets in turn, reading the files of upcoming ones in the background.'''
+        assetnames = list(assetnames)
+        queue = self.prefetch(assetnames)
+        try:
+            for assetname in assetnames:
+                try:
+                    asset = self.load_asset(assetname, quiet=quiet)
+                finally:
+                    self.release_prefetch(queue, assetname)
+                yield asset
+        finally:
+            self.cancel_prefetch(queue)
+
+    def prefetch(self, assetnames: Iterable[str]) -> Optional[PrefetchQueue]:
+        '''
+        Queue assets that are about to be loaded, in order, so they can be read (or parsed) in the background.
+        Returns the queue to pass to `cancel_prefetch` once done with it.
+        Does nothing unless the loader was created with a `prefetch_count` or `parse_processes`.
+        '''
+        read_ahead = self.parse_service or self.prefetcher
+        if read_ahead:
+            return read_ahead.add(assetnames)
+        return None
+
+    def cancel_prefetch(self, queue: Optional[PrefetchQueue]) -> None:
+        '''Drop a queue returned by `prefetch`, along with any of its data that has already been read ahead.'''
+        read_ahead = self.parse_service or self.prefetcher
+        if read_ahead and queue:
+            read_ahead.cancel(queue)
+
+    def release_prefetch(self, queue: Optional[PrefetchQueue], assetname: str) -> None:
+        '''Mark an asset from a queue returned by `prefetch` as done with, dropping any unused data read ahead for it.'''
+        read_ahead = self.parse_service or self.prefetcher
+        if read_ahead and queue:
+            read_ahead.release(queue, assetname)
+
+    def close(self) -> None:
+        '''Stop any background reading or parsing and shut down its workers. The loader can still be used after.'''
+        if self.prefetcher:
+            self.prefetcher.close()
+        if self.parse_service:
+            self.parse_service.close()
+
     def __getitem__(self, assetname: str) -> UAsset:
         '''Load and parse the given asset, or fetch it from the cache if already loaded.'''
         return self.load_asset(assetname)
@@ -529,45 +974,46 @@ class AssetLoader:
     def _load_asset(self, assetname: str, doNotLink=False, quiet=False, cache_result=True) -> UAsset:
         if not quiet:
             logger.debug("Loading asset: %s", assetname)
-        mem, ext = self.load_raw_asset(assetname)
+        path, ext = self.find_asset_file(assetname)
+
+        if self.persistent_cache and not doNotLink:
+            stored_asset = self.persistent_cache.load(assetname, path, self)
+            if stored_asset:
+                if cache_result:
+                    self.cache.add(assetname, stored_asset)
+                return stored_asset
+
+        if self.parse_service and not doNotLink:
+            parsed_asset = self.parse_service.take(assetname)
+            if parsed_asset:
+                self.stats.assets_from_workers += 1
+                if self.persistent_cache:
+                    self.persistent_cache.save(parsed_asset, path)
+                if cache_result:
+                    self.cache.add(assetname, parsed_asset)
+                return parsed_asset
+
+        mem = self.prefetcher.take(assetname) if self.prefetcher else None
+        if mem is None:
+            mem = load_file_into_memory(path, use_mmap=self.use_mmap)
+            if self.lazy_properties and self.use_mmap:
+                # Retained data is copied out of the mapping so it does not hold the file open
+                mapped, mem = mem, memoryview(mem.tobytes())
+                release_file_memory(mapped)
+
+        start_time = time.perf_counter()
         try:
-            stream = MemoryStream(mem, 0, len(mem))
-            asset = UAsset(stream)
-            asset.loader = self
-            asset.assetname = assetname
-            asset.name = assetname.split('/')[-1]
-            asset.file_ext = ext
-
-            try:
-                asset.deserialise()
-                if doNotLink:
-                    return asset
-                asset.link()
-            except Exception as ex:
-                raise AssetParseError(assetname) from ex
+            asset = parse_asset(mem, assetname, ext, loader=self, lazy_properties=self.lazy_properties, link=not doNotLink)
         finally:
-            mem.release()
+            self.stats.record_parse(len(mem), time.perf_counter() - start_time)
+            if not self.lazy_properties:
+                release_file_memory(mem)
 
-        leafname = assetname.split('/')[-1]
-
-        # Check only exports with no namespace (top-level ones)
-        top_exports = [export for export in asset.exports.values if str(export.namespace) == 'None']
+        if doNotLink:
+            return asset
 
-        # Look for a BP-style Default__<assetname> export
-        exports = [export for export in top_exports if str(export.name).startswith('Default__')]
-        if len(exports) > 1:
-            logger.warning(f'Found more than one Default__ entry in {assetname}!')
-        asset.default_export = exports[0] if exports else None
-        if asset.default_export:
-            asset.default_class = asset.default_export.klass.value
-
-        if not asset.default_export:
-            # Fall back to an export named the same as the asset with no namespace
-            exports = [export for export in top_exports if str(export.name).lower() == leafname.lower()]
-            if len(exports) > 1:
-                logger.warning(f'Found more than <assetname> export in {assetname}!')
-            else:
-                asset.default_export = exports[0] if exports else None
+        if self.persistent_cache:
+            self.persistent_cache.save(asset, path)
 
         if cache_result:
             self.cache.add(assetname, asset)
@@ -575,50 +1021,174 @@ class AssetLoader:
         return asset
 
 
-def find_caseinsensitive_path(base: Path, *parts: str) -> Optional[Path]:
-    if not parts:
-        return base
-
-    current: Optional[Path] = base
-    for part in parts:
-        if not current:
-            return None
-        current = current / part
-        current = find_caseinsensitive_path_match(current)
-    return current
-
+def parse_asset(mem: memoryview,
+                assetname: str,
+                ext: str,
+                *,
+                loader: Optional[AssetLoader] = None,
+                lazy_properties=False,
+                link=True) -> UAsset:
+    '''Parse an asset from data in memory, finding its default export if it is linked. The data is not released.'''
+    stream = MemoryStream(mem, 0, len(mem))
+    asset = UAsset(stream)
+    asset.loader = loader
+    asset.assetname = assetname
+    asset.name = assetname.split('/')[-1]
+    asset.file_ext = ext
+    asset.file_size = len(mem)
+    asset.lazy_properties = lazy_properties
+
+    try:
+        asset.deserialise()
+        if not link:
+            return asset
+        asset.link()
+    except Exception as ex:
+        raise AssetParseError(assetname) from ex
+
+    leafname = assetname.split('/')[-1]
+
+    # Check only exports with no namespace (top-level ones)
+    top_exports = [export for export in asset.exports.values if str(export.namespace) == 'None']
+
+    # Look for a BP-style Default__<assetname> export
+    exports = [export for export in top_exports if str(export.name).startswith('Default__')]
+    if len(exports) > 1:
+        logger.warning(f'Found more than one Default__ entry in {assetname}!')
+    asset.default_export = exports[0] if exports else None
+    if asset.default_export:
+        asset.default_class = asset.default_export.klass.value
+
+    if not asset.default_export:
+        # Fall back to an export named the same as the asset with no namespace
+        exports = [export for export in top_exports if str(export.name).lower() == leafname.lower()]
+        if len(exports) > 1:
+            logger.warning(f'Found more than <assetname> export in {assetname}!')
+        else:
+            asset.default_export = exports[0] if exports else None
 
-PATH_NO_MATCH = Path('THERE_IS_NO_SUCH_FILE')
-path_match_cache: Dict[Path, Optional[Path]] = dict()
+    return asset
 
 
-def find_caseinsensitive_path_match(path: Path) -> Optional[Path]:
+class AssetNameFilter:
     '''
-    Find a match for the given path by matching its last element case-insensitively.
+    Include and exclude regexes for asset names, each compiled into a single pattern.
+    As with `re.match`, a pattern only has to match the start of a name.
     '''
-    cached = path_match_cache.get(path, PATH_NO_MATCH)
-    if cached is not PATH_NO_MATCH:
-        return cached
 
-    logger.debug(f"Uncached case-insensitive search: {path}")
+    def __init__(self, includes: Iterable[str], excludes: Iterable[str]):
+        includes = tuple(includes)
+        excludes = tuple(excludes)
+        self.include = _combine_patterns(includes)
+        self.exclude = _combine_patterns(excludes)
+
+        # Only patterns that still match when more is added to the end of a name can exclude whole directories
+        self.directory_exclude = _combine_patterns(tuple(p for p in excludes if _is_extendable_pattern(p)))
+        self.include_prefixes = tuple(_get_literal_prefix(p) for p in includes)
+        self.can_exclude_directories = bool(self.directory_exclude) and '' not in self.include_prefixes
+
+    def matches(self, assetname: str) -> bool:
+        '''Check if an asset name passes the filter: forced inclusions first, then exclusions.'''
+        if self.include and self.include.match(assetname):
+            return True
+        return not (self.exclude and self.exclude.match(assetname))
 
-    if path.exists():
-        path_match_cache[path] = path
-        return path
+    def excludes_all_within(self, prefix: Optional[str]) -> bool:
+        '''Check if every asset name starting with `prefix` would fail the filter.'''
+        if not prefix or not self.can_exclude_directories:
+            return False
+        if any(p.startswith(prefix) or prefix.startswith(p) for p in self.include_prefixes):
+            return False
+        return bool(self.directory_exclude.match(prefix))  # type: ignore
 
-    parent: Path = path.parent
-    name = path.name.lower()
-    found: Path
-    for found in parent.iterdir():
-        if found.name.lower() == name:
-            path_match_cache[path] = found
-            return found
 
-    return None
+REGEX_SPECIAL_CHARS = frozenset('.^$*+?{}[]\\|()')
+REGEX_END_ASSERTIONS = ('$', '\\Z', '\\b', '\\B', '(?=', '(?!')
 
 
-def load_file_into_memory(filename):
+def _combine_patterns(patterns: Tuple[str, ...]) -> Optional[Pattern]:
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+
+
+def _is_extendable_pattern(pattern: str) -> bool:
+    '''Check if a match of this pattern must also match any string that starts with the matched string.'''
+    return not any(assertion in pattern for assertion in REGEX_END_ASSERTIONS)
+
+
+def _get_literal_prefix(pattern: str) -> str:
+    '''Get the literal text that any match of this pattern must start with (possibly empty).'''
+    if '|' in pattern:
+        return ''
+
+    prefix: List[str] = []
+    for char in pattern:
+        if char in REGEX_SPECIAL_CHARS:
+            # The previous character is optional if it is followed by one of these quantifiers
+            if char in '*?{' and prefix:
+                prefix.pop()
+            break
+        prefix.append(char)
+
+    return ''.join(prefix)
+
+
+def _is_plain_asset_leafname(name: str) -> bool:
+    '''Check if a file's name can be appended to its directory's asset name prefix without further cleaning.'''
+    return '.' not in name and '\\' not in name and not name.isnumeric() and name == name.rstrip()
+
+
+def load_file_into_memory(filename, use_mmap=False) -> memoryview:
+    '''
+    Load a file into a memoryview.
+
+    With `use_mmap` the file is memory-mapped read-only instead of being copied onto the heap, so only the pages
+    that are actually read are brought in. The mapping keeps the file open until it is closed, so release the result
+    with `release_file_memory` rather than leaving it to the garbage collector.
+    '''
     with open(filename, 'rb') as f:
+        if use_mmap:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                pass
+            else:
+                return memoryview(mapped)
+
         data = f.read()
         mem = memoryview(data)
     return mem
+
+
+def release_file_memory(mem: memoryview):
+    '''
+    Release memory returned by `load_file_into_memory`, closing its file mapping straight away if it has one.
+    If other views of a mapping are still in use it is instead closed when the last of them is garbage collected.
+    '''
+    mapped = mem.obj if isinstance(mem.obj, mmap.mmap) else None
+    mem.release()
+    if mapped is not None:
+        try:
+            mapped.close()
+        except BufferError:
+            pass
+
+
+def load_asset_summary_from_file(filename: Union[str, Path], assetname: str, ext: str, use_mmap=False) -> AssetSummary:
+    '''
+    Read the summary of an asset directly from its file.
+    This does not need an `AssetLoader`, so is suitable for use in worker processes.
+    '''
+    try:
+        mem = load_file_into_memory(filename, use_mmap=use_mmap)
+    except FileNotFoundError:
+        raise AssetNotFound(assetname)
+
+    try:
+        return read_asset_summary(mem, assetname, ext)
+    except Exception as ex:
+        raise AssetParseError(assetname) from ex
+    finally:
+        release_file_memory(mem)
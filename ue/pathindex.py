@@ -0,0 +1,125 @@
+'''
+Case-insensitive index of the files below a directory, used to resolve asset names to files.
+
+Each directory is listed with `os.scandir` once, the first time it is needed, and every lookup is remembered
+whether it found anything or not. After that, finding a path is a dictionary lookup with no filesystem access.
+Call `clear` when the files may have changed, for example after mods are installed.
+'''
+
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+__all__ = [
+    'PathIndex',
+]
+
+# Actual relative path (using /) and whether it is a directory
+FoundPath = Tuple[str, bool]
+
+
+class DirListing:
+    '''The entries of a single directory, by name and by lowercase name.'''
+
+    def __init__(self, path: Path):
+        self.names: Dict[str, bool] = dict()
+        self.lower_names: Dict[str, str] = dict()
+
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    self.names[entry.name] = is_dir
+                    self.lower_names.setdefault(entry.name.lower(), entry.name)
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+
+    def match(self, name: str) -> Optional[str]:
+        '''Find an entry matching the given name, preferring an exact match.'''
+        if name in self.names:
+            return name
+        return self.lower_names.get(name.lower(), None)
+
+
+class PathIndex:
+    '''Find files and directories below `base` case-insensitively, listing each directory only once.'''
+
+    def __init__(self, base: Path):
+        self.base = Path(base)
+        self.listings: Dict[str, DirListing] = dict()
+        self.found: Dict[str, Optional[FoundPath]] = dict()
+
+    def clear(self):
+        '''Forget everything that has been read, so that changes to the files are seen.'''
+        self.listings = dict()
+        self.found = dict()
+
+    def find(self, *parts: str, is_dir: Optional[bool] = None) -> Optional[Path]:
+        '''
+        Find the path matching the given parts case-insensitively, or None if there is no match.
+        If `is_dir` is given then only a directory (True) or a file (False) will match.
+        '''
+        found = self._resolve(parts)
+        if not found:
+            return None
+
+        relpath, found_dir = found
+        if is_dir is not None and found_dir != is_dir:
+            return None
+
+        return self.base.joinpath(relpath) if relpath else self.base
+
+    def walk(self, *parts: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+        '''
+        Yield (relative path, directory names, file names) for the given directory and each directory below it.
+        Directories are visited top-down and, as with `os.walk`, names removed from the yielded directory list
+        are not visited.
+        '''
+        found = self._resolve(parts)
+        if not found or not found[1]:
+            return
+
+        pending = [found[0]]
+        while pending:
+            relpath = pending.pop()
+            listing = self._get_listing(relpath)
+            dirnames = [name for name, is_dir in listing.names.items() if is_dir]
+            yield (relpath, dirnames, [name for name, is_dir in listing.names.items() if not is_dir])
+
+            prefix = relpath + '/' if relpath else ''
+            pending.extend(prefix + name for name in reversed(dirnames))
+
+    def _resolve(self, parts: Tuple[str, ...]) -> Optional[FoundPath]:
+        key = '/'.join(parts)
+        try:
+            return self.found[key]
+        except KeyError:
+            pass
+
+        result: Optional[FoundPath] = ('', True)
+        for part in parts:
+            if not part:
+                continue  # empty parts are ignored, as Path does
+
+            assert result
+            relpath, is_dir = result
+            listing = self._get_listing(relpath) if is_dir else None
+            actual = listing.match(part) if listing else None
+            if listing is None or actual is None:
+                result = None
+                break
+
+            result = (relpath + '/' + actual if relpath else actual, listing.names[actual])
+
+        self.found[key] = result
+        return result
+
+    def _get_listing(self, relpath: str) -> DirListing:
+        listing = self.listings.get(relpath, None)
+        if listing is None:
+            listing = DirListing(self.base.joinpath(relpath) if relpath else self.base)
+            self.listings[relpath] = listing
+        return listing
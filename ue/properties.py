@@ -5,9 +5,10 @@ import sys
 import uuid
 import warnings
 from abc import ABC, abstractmethod
+from array import array
 from collections import defaultdict
 from numbers import Real
-from typing import Any, ByteString, Dict, List, Optional, Set, Tuple, Type, Union
+from typing import AbstractSet, Any, ByteString, Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple, Type, Union
 
 from utils.log import get_logger
 
@@ -15,7 +16,7 @@ from .base import UEBase
 from .context import INCLUDE_METADATA
 from .coretypes import NameIndex, ObjectIndex
 from .number import make_binary_operator, make_binary_operators, make_operator
-from .stream import MemoryStream
+from .stream import DOUBLE, FLOAT, MemoryStream
 from .utils import clean_double, clean_float
 
 if INCLUDE_METADATA:
@@ -35,8 +36,23 @@ logger = get_logger(__name__)
 
 PropDict = Dict[str, Dict[int, UEBase]]
 
+# The (name, property type, skip length) result of decode_type_or_name
+DecodedTypeName = Tuple[Optional[str], Optional[Type[UEBase]], Optional[float]]
+
 NO_FALLBACK = object()
 
+EMPTY_PROP_VALUES: Dict[int, UEBase] = dict()
+
+GUID_WORDS_BE = struct.Struct('>4I')
+
+# Bytes of type-specific tag data that follow a property header but are not included in its size
+PROPERTY_TAG_EXTRA_SIZES = {
+    'BoolProperty': 1,
+    'ByteProperty': 8,
+    'StructProperty': 8,
+    'ArrayProperty': 8,
+}
+
 
 class PropertyTable(UEBase):
     string_format = '{count} entries'
@@ -47,10 +63,18 @@ class PropertyTable(UEBase):
     values: List["Property"]
 
     def as_dict(self) -> PropDict:
-        return self._as_dict or self._convert_to_dict()
+        '''
+        Get the properties as `result[name][index] = value`. This is built during parsing and must not be modified.
+        Missing names and indexes are simply absent (this is not a defaultdict), so use `get_property` or `.get` for
+        properties that may not be set.
+        '''
+        if self._as_dict is None:
+            raise RuntimeError('PropertyTable not deserialised before read')
+
+        return self._as_dict
 
     def get_property(self, name: str, index: int = 0, fallback=NO_FALLBACK) -> UEBase:
-        value = self.as_dict()[name][index]
+        value = self.as_dict().get(name, EMPTY_PROP_VALUES).get(index, None)
 
         if value is not None:
             return value
@@ -60,38 +84,35 @@ class PropertyTable(UEBase):
 
         raise KeyError(f"Property {name}[{index}] not found")
 
-    def _convert_to_dict(self):
-        result: PropDict = defaultdict(lambda: defaultdict(lambda: None))
-
-        for prop in self.values:
-            name = str(prop.header.name)
-            idx = prop.header.index
-            value = prop.value
-
-            result[name][idx] = value
-
-        self._as_dict = result
-        return result
-
-    def _deserialise(self):
-        values = []
+    def _deserialise(self, wanted: Optional[AbstractSet[str]] = None):
+        '''`wanted` limits parsing to properties with the given names, skipping over all others.'''
+        values: List[Property] = []
         self._newField('values', values)
+        as_dict: PropDict = dict()
 
         while self.stream.offset < (self.stream.end - 8):
-            value = self._parseField()
-            if value is None:
+            if wanted is not None and self._skipUnwantedField(wanted):
+                continue
+
+            prop = self._parseField()
+            if prop is None:
                 break
-            values.append(value)
+            values.append(prop)
+
+            header = prop.header
+            indexed_values = as_dict.get(header.name, None)
+            if indexed_values is None:
+                indexed_values = as_dict[header.name] = dict()
+            indexed_values[header.index] = prop.value
 
         self._newField('count', len(values))
+        self._as_dict = as_dict
 
     def _parseField(self):
-        # Records the current offset
-        saved_offset = self.stream.offset
-
         # Check for a None name here - that's the terminator
-        name = NameIndex(self).deserialise()
-        if name.index == self.asset.none_index:
+        saved_offset = self.stream.offset
+        if self.stream.readUInt32() == self.asset.none_index:
+            self.stream.offset = saved_offset + 8
             return None
 
         # Reset back to the saved offset and read the whole property
@@ -101,6 +122,30 @@ class PropertyTable(UEBase):
 
         return value
 
+    def _skipUnwantedField(self, wanted: AbstractSet[str]) -> bool:
+        '''Skip over the next property if its name is not wanted, without creating any objects for it.'''
+        saved_offset = self.stream.offset
+        name_index, name_instance = self.stream.readUInt32Array(2)
+
+        # Leave the terminator to be parsed normally, without reading past it
+        # Also leave anything too short to be a full tag, so it is reported as it would be without `wanted`
+        if name_index == self.asset.none_index or self.stream.offset + 16 > self.stream.end:
+            self.stream.offset = saved_offset
+            return False
+
+        # Leave wanted properties to be parsed normally
+        name = str(self.asset.getName(name_index))
+        if name_instance:
+            name = f'{name}_{name_instance - 1}'
+        if clean_property_name(name) in wanted:
+            self.stream.offset = saved_offset
+            return False
+
+        type_index, _, size, _ = self.stream.readUInt32Array(4)
+        type_name = str(self.asset.getName(type_index))
+        self.stream.offset += size + PROPERTY_TAG_EXTRA_SIZES.get(type_name, 0)
+        return True
+
     def __getitem__(self, index: int):
         '''Provide access using the index via the table[index] syntax.'''
         if self.values is None:
@@ -112,14 +157,8 @@ class PropertyTable(UEBase):
         return len(self.values)
 
     def format_for_json(self):
-        # Pull all props into `out[name][index] = value` format
-        out = defaultdict(dict)
-        for p in self.values:
-            out[p.header.name][p.header.index] = p.value
-
         # Reduce any prop with just index 0 to only its value
-        out = {k: v[0] if list(v.keys()) == [0] else v for k, v in out.items()}
-        return out
+        return {name: values[0] if len(values) == 1 and 0 in values else values for name, values in self.as_dict().items()}
 
     if INCLUDE_METADATA and support_pretty:
 
@@ -139,6 +178,7 @@ class PropertyTable(UEBase):
 
 
 class PropertyHeader(UEBase):
+    __slots__ = ('name_id', 'type', 'size', 'index', 'name')
     display_fields = ['name', 'index']
 
     name: str
@@ -148,40 +188,42 @@ class PropertyHeader(UEBase):
     index: int
 
     def _deserialise(self):
-        self._newField('name_id', NameIndex(self))
-        self._newField('type', NameIndex(self))
-        self._newField('size', self.stream.readUInt32())
-        self._newField('index', self.stream.readUInt32())
+        self.name_id = NameIndex(self).deserialise()
+        self.type = NameIndex(self).deserialise()
+        self.size, self.index = self.stream.readUInt32Array(2)
 
     def _link(self):
-        super()._link()
-        clean_name = str(self.name_id).strip()
-        clean_name = clean_name.replace(' ', '_')
-        self._newField('name', clean_name)
+        self.name_id.link()
+        self.type.link()
+        self.name = clean_property_name(str(self.name_id))
 
 
 class Property(UEBase):
+    __slots__ = ('header', 'value')
     string_format = '{header.name}[{header.index}] = {value}'
 
     header: PropertyHeader
     value: UEBase
 
     def _deserialise(self):
-        self._newField('header', PropertyHeader(self))
-        self.header.link()  # safe to link as all imports/exports are completed
-        propertyType = None
-        try:
-            propertyType = getPropertyType(self.header.type.value.value)
-        except TypeError:
-            if self.header.type.value.value not in SKIPPABLE_STRUCTS:
-                warnings.warn(f'Skipping unknown property type {self.header.type.value.value}')
+        header = self.header = PropertyHeader(self).deserialise()
+        header.link()  # safe to link as all imports/exports are completed
+        type_name, propertyType, _ = decode_type_or_name(header.type, skip_deserialise=True)
+        if not propertyType and type_name not in SKIPPABLE_STRUCTS:
+            warnings.warn(f'Skipping unknown property type {type_name}')
 
         if propertyType:
-            self._newField('value', propertyType(self), self.header.size)
-            self.value.link()  # safe to link as all imports/exports are completed
+            value = self.value = propertyType(self)
+            value.deserialise(header.size)
+            value.link()  # safe to link as all imports/exports are completed
         else:
-            self._newField('value', f'<unsupported type {str(self.header.type)}>')
-            self.stream.offset += self.header.size
+            self.value = f'<unsupported type {str(header.type)}>'
+            self.stream.offset += header.size
+
+    def _link(self):
+        self.header.link()
+        if isinstance(self.value, UEBase):
+            self.value.link()
 
     if INCLUDE_METADATA and support_pretty:
 
@@ -204,6 +246,8 @@ class DummyAsset(UEBase):
         for k, v in kwargs.items():
             vars(self).setdefault(k, v)
         self.fake_names = dict()
+        self.decoded_type_names = dict()
+        self.object_count = 0
         self.index = 0
         self.none_index = 9999
         self.asset = self
@@ -229,6 +273,8 @@ class DummyAsset(UEBase):
 
 
 class ValueProperty(UEBase, Real, ABC):
+    __slots__ = ()
+
     value: Real
 
     @abstractmethod
@@ -307,6 +353,7 @@ class ValueProperty(UEBase, Real, ABC):
 
 
 class FloatProperty(ValueProperty):
+    __slots__ = ('value', 'raw_data', 'rounded', 'rounded_value', 'textual')
     main_field = 'textual'
     display_fields = ['textual']
 
@@ -362,24 +409,20 @@ class FloatProperty(ValueProperty):
         return obj
 
     def _deserialise(self, size=None):
-        # Read once as a float
-        saved_offset = self.stream.offset
-        self._newField('value', self.stream.readFloat())
-
-        # Read again as plain bytes for exact exporting
-        self.stream.offset = saved_offset
-        self._newField('raw_data', self.stream.readBytes(4))
+        # Read as plain bytes for exact exporting, then decode those as a float
+        raw_data = self.stream.readBytes(4)
+        value = self.value = FLOAT.unpack(raw_data)[0]
+        self.raw_data = raw_data
 
         # Make a rounded textual version with (inexact) if required
-        value = self.value
         rounded = round(value, 6)
         inexact = abs(value - rounded) >= sys.float_info.epsilon
         text = str(rounded)
-        self._newField('rounded', text)
-        self._newField('rounded_value', rounded)
+        self.rounded = text
+        self.rounded_value = rounded
         if inexact:
             text += ' (inexact)'
-        self._newField('textual', text)
+        self.textual = text
 
     def __bytes__(self):
         assert self.is_serialised
@@ -404,13 +447,10 @@ class DoubleProperty(ValueProperty):
     rounded_value: float
 
     def _deserialise(self, size=None):
-        # Read once as a float
-        saved_offset = self.stream.offset
-        self._newField('value', self.stream.readDouble())
-
-        # Read again as plain bytes for exact exporting
-        self.stream.offset = saved_offset
-        self._newField('bytes', self.stream.readBytes(8))
+        # Read as plain bytes for exact exporting, then decode those as a double
+        raw_data = self.stream.readBytes(8)
+        self._newField('value', DOUBLE.unpack(raw_data)[0])
+        self._newField('bytes', raw_data)
 
         # Make a rounded textual version with (inexact) if required
         value = self.value
@@ -428,6 +468,7 @@ class DoubleProperty(ValueProperty):
 
 
 class IntProperty(ValueProperty):
+    __slots__ = ('value', )
     string_format = '(int) {value}'
     main_field = 'value'
 
@@ -446,7 +487,7 @@ class IntProperty(ValueProperty):
         return obj
 
     def _deserialise(self, size=None):
-        self._newField('value', self.stream.readInt32())
+        self.value = self.stream.readInt32()
 
     @classmethod
     def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
@@ -455,10 +496,11 @@ class IntProperty(ValueProperty):
 
 
 class UInt32Property(IntProperty):
+    __slots__ = ()
     string_format = '(uint) {value}'
 
     def _deserialise(self, size=None):
-        self._newField('value', self.stream.readUInt32())
+        self.value = self.stream.readUInt32()
 
 
 class BoolProperty(ValueProperty):
@@ -696,11 +738,11 @@ class Guid(UEBase):
     value: uuid.UUID
 
     def _deserialise(self, *args):
-        raw_bytes = self.stream.readBytes(16)
+        words = self.stream.readUInt32Array(4)
         # Here we need to reverse the endian of each 4-byte word
         # to match C# UUID decoder. Python's bytes_le only corrects
         # some of the fields as the rest are single bytes.
-        value = uuid.UUID(bytes=struct.pack('>4I', *struct.unpack('<4I', raw_bytes)))
+        value = uuid.UUID(bytes=GUID_WORDS_BE.pack(*words))
         self._newField('value', value)
 
     def format_for_json(self):
@@ -719,6 +761,7 @@ class CustomVersion(UEBase):
 
 
 class StructEntry(UEBase):
+    __slots__ = ('name_id', 'type', 'length', 'name', 'value')
     string_format = '{name} = ({type}) {value}'
 
     name: str
@@ -728,37 +771,34 @@ class StructEntry(UEBase):
     value: UEBase
 
     def _deserialise(self):
-        self._newField('name_id', NameIndex(self))
-        self._newField('type', '<not yet defined>')
+        name_id = self.name_id = NameIndex(self).deserialise()
         entryType = NameIndex(self).deserialise()
-        self._newField('length', self.stream.readInt64())
+        self.length = self.stream.readInt64()
 
-        self.name_id.link()
-        clean_name = str(self.name_id).strip()
+        name_id.link()
+        clean_name = str(name_id).strip()
         clean_name = clean_name.replace(' ', '_')
-        self._newField('name', clean_name)
+        self.name = clean_name
 
         name, propertyType, skipLength = decode_type_or_name(entryType, skip_deserialise=True)
-        self.field_values['type'] = entryType
+        self.type = entryType
 
         if dbg_structs > 1:
             print(f'    StructEntry @ {self.start_offset}: name={self.name}, type={entryType}, length={self.length}')
 
         # We may know the type of the data to go into this...
-        subTypeName = TYPED_ARRAY_CONTENT.get(str(self.name), None)
+        subTypeName = TYPED_ARRAY_CONTENT.get(clean_name, None)
         if propertyType == ArrayProperty and subTypeName is not None:
-            self._newField('value', '<not yet defined>')
             subType = getPropertyType(subTypeName)
-            self.field_values['value'] = ArrayProperty(self)
-            self.field_values['value'].deserialise(self.length, with_type=subType)
-            self.field_values['value'].link()
+            value = self.value = ArrayProperty(self)
+            value.deserialise(self.length, with_type=subType)
+            value.link()
             if dbg_structs > 1:
                 print('     = ', str(self.value))
         elif propertyType:
-            self._newField('value', '<not yet defined>')
-            self.field_values['value'] = propertyType(self)
-            self.field_values['value'].deserialise(self.length)
-            self.field_values['value'].link()
+            value = self.value = propertyType(self)
+            value.deserialise(self.length)
+            value.link()
             if dbg_structs > 1:
                 print('     = ', str(self.value))
 
@@ -768,7 +808,7 @@ class StructEntry(UEBase):
             self.stream.offset += self.length
             if dbg_structs > 1:
                 print(f'  Recognised as skippable: {self.length} bytes')
-            self.field_values['value'] = f'<skipped {name} ({self.length} bytes)>'
+            self.value = f'<skipped {name} ({self.length} bytes)>'
             self.stream.offset += skipLength
             return
 
@@ -805,18 +845,29 @@ TYPED_ARRAY_CONTENT = {
 }
 
 
-def decode_type_or_name(type_or_name: NameIndex, skip_deserialise=False):
-    '''Decode a name as either a supported type, a length of an unsupported but skippable type, or a simple name.'''
+def decode_type_or_name(type_or_name: NameIndex, skip_deserialise=False) -> DecodedTypeName:
+    '''
+    Decode a name as either a supported type, a length of an unsupported but skippable type, or a simple name.
+    Results are remembered by the asset, as a name index always decodes the same way.
+    '''
     if not skip_deserialise:
         type_or_name.deserialise()
-    if type_or_name.index == type_or_name.asset.none_index:
+    asset = type_or_name.asset
+    if type_or_name.index == asset.none_index:
         return None, None, None
     type_or_name.link()
 
-    if dbg_structs > 1:
-        print(f'  Entry "{type_or_name}"')
+    key = (type_or_name.index, type_or_name.instance)
+    result = asset.decoded_type_names.get(key, None)
+    if result is None:
+        result = asset.decoded_type_names[key] = _decode_type_name(str(type_or_name))
+
+    return result
 
-    name = str(type_or_name)
+
+def _decode_type_name(name: str) -> DecodedTypeName:
+    if dbg_structs > 1:
+        print(f'  Entry "{name}"')
 
     # Is it a supported type?
     propertyType = getPropertyType(name, throw=False)
@@ -907,9 +958,8 @@ class StructProperty(UEBase):
         while True:
             # Peek the name and terminate on None
             saved_offset = self.stream.offset
-            type_or_name = NameIndex(self)
-            type_or_name.deserialise()
-            if type_or_name.index == self.asset.none_index:
+            if self.stream.readUInt32() == self.asset.none_index:
+                self.stream.offset = saved_offset + 8
                 return
             self.stream.offset = saved_offset
 
@@ -1003,6 +1053,16 @@ class ArrayProperty(UEBase):
             self._newField('value', f'<unsupported field type {self.field_type}>')
             return
 
+        # Arrays of fixed-size primitives are decoded in one go
+        packing = PACKED_ARRAY_TYPES.get(propertyType, None)
+        if packing and size - 4 == self.count * packing.width * 4:
+            data = array(packing.typecode)
+            data.frombytes(self.stream.readBytes(size - 4))
+            if sys.byteorder != 'little':
+                data.byteswap()
+            self._newField('values', PackedArrayValues(self, propertyType, data))
+            return
+
         values: List[Union[UEBase, str]] = []
         self._newField('values', values)
 
@@ -1058,6 +1118,59 @@ class ArrayProperty(UEBase):
                     p.text(', ' + str(self.value))
 
 
+class PackedArrayValues(Sequence):
+    '''
+    The contents of an array of fixed-size primitives, such as floats or vectors, held in a typed array.
+    Element objects are only created when individual entries are read.
+    '''
+
+    def __init__(self, owner: ArrayProperty, item_type: Type[UEBase], data: array):
+        self.owner = owner
+        self.item_type = item_type
+        self.data = data
+        self.width = PACKED_ARRAY_TYPES[item_type].width
+        self._items: Optional[List[Optional[UEBase]]] = None
+
+    def __len__(self):
+        return len(self.data) // self.width
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError('array index out of range')
+
+        if self._items is None:
+            self._items = [None] * count
+
+        item = self._items[index]
+        if item is None:
+            item = self._items[index] = self._create_item(index)
+        return item
+
+    def _create_item(self, index: int) -> UEBase:
+        start = index * self.width
+        raw = self.data[start:start + self.width]
+        if sys.byteorder != 'little':
+            raw.byteswap()
+
+        item = self.item_type(self.owner, MemoryStream(raw.tobytes()))
+        item.is_inside_array = True
+        item.deserialise(raw.itemsize * self.width)
+        item.link()
+        return item
+
+    def format_for_json(self):
+        return PACKED_ARRAY_TYPES[self.item_type].format_for_json(self.data)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
 class Vector(UEBase):
     x: FloatProperty
     y: FloatProperty
@@ -1160,8 +1273,9 @@ class IntPoint(UEBase):
     y: int
 
     def _deserialise(self, size=None):
-        self._newField('x', self.stream.readInt32())
-        self._newField('y', self.stream.readInt32())
+        x, y = self.stream.readInt32Array(2)
+        self._newField('x', x)
+        self._newField('y', y)
 
 
 class EngineVersion(UEBase):
@@ -1208,6 +1322,30 @@ TYPE_MAP = {
 }
 
 
+class ArrayPacking(NamedTuple):
+    typecode: str
+    width: int
+    format_for_json: Callable[[array], list]
+
+
+def _format_packed_vectors(data: array) -> List[Dict[str, float]]:
+    values = [clean_float(value) for value in data]
+    return [{'x': x, 'y': y, 'z': z} for x, y, z in zip(values[0::3], values[1::3], values[2::3])]
+
+
+# Element types of arrays that are decoded in bulk into a PackedArrayValues, all made of 4-byte items
+PACKED_ARRAY_TYPES: Dict[Type[UEBase], ArrayPacking] = {
+    FloatProperty: ArrayPacking('f', 1, lambda data: [clean_float(value) for value in data]),
+    IntProperty: ArrayPacking('i', 1, array.tolist),
+    UInt32Property: ArrayPacking('I', 1, array.tolist),
+    Vector: ArrayPacking('f', 3, _format_packed_vectors),
+}
+
+
+def clean_property_name(name: str) -> str:
+    return name.strip().replace(' ', '_')
+
+
 def getPropertyType(typeName: str, throw=True):
     result = TYPE_MAP.get(typeName, None)
     if throw and result is None:
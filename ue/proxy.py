@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Type, TypeVar, Union
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Tuple, Type, TypeVar, Union
 
 from utils.generics import get_generic_args
 
@@ -48,6 +48,14 @@ class UEProxyStructure:
     def get_defaults(cls):
         return getattr(cls, _UEFIELDS)
 
+    @classmethod
+    def get_field_names(cls) -> FrozenSet[str]:
+        '''All field names declared by this proxy and its bases, including those with only a type annotation.'''
+        names = set(cls.get_defaults())
+        for base in cls.__mro__:
+            names.update(name for name in vars(base).get('__annotations__', {}) if not name.startswith('_'))
+        return frozenset(names)
+
     def __init_subclass__(cls, uetype: str):
         if not uetype and not getattr(cls, '_EmptyProxy__is_empty_proxy', None):
             raise ValueError("uetype must be specified for this proxy class")
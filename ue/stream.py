@@ -1,7 +1,28 @@
 import struct
+from functools import lru_cache
+from typing import Any, List, Tuple
 
 __all__ = ('MemoryStream', )
 
+INT8 = struct.Struct('<b')
+UINT8 = struct.Struct('<B')
+INT16 = struct.Struct('<h')
+UINT16 = struct.Struct('<H')
+INT32 = struct.Struct('<i')
+UINT32 = struct.Struct('<I')
+INT64 = struct.Struct('<q')
+UINT64 = struct.Struct('<Q')
+FLOAT = struct.Struct('<f')
+DOUBLE = struct.Struct('<d')
+
+
+@lru_cache(maxsize=256)
+def get_struct(fmt: str, count: int = 1) -> struct.Struct:
+    '''Get a compiled little-endian struct for the given format, repeated `count` times.'''
+    if count == 1:
+        return struct.Struct('<' + fmt)
+    return struct.Struct('<' + str(count) + fmt)
+
 
 class MemoryStream:
     mem: memoryview
@@ -27,40 +48,60 @@ class MemoryStream:
         return self.size
 
     def readInt8(self) -> int:
-        return self._read('b')
+        return self._unpack(INT8)[0]
 
     def readUInt8(self) -> int:
-        return self._read('B')
+        return self._unpack(UINT8)[0]
 
     def readBool8(self) -> bool:
-        return bool(self._read('B'))
+        return bool(self._unpack(UINT8)[0])
 
     def readBool32(self) -> bool:
-        return bool(self._read('I'))
+        return bool(self._unpack(UINT32)[0])
 
     def readUInt16(self) -> int:
-        return self._read('H')
+        return self._unpack(UINT16)[0]
 
     def readInt16(self) -> int:
-        return self._read('h')
+        return self._unpack(INT16)[0]
 
     def readUInt32(self) -> int:
-        return self._read('I')
+        return self._unpack(UINT32)[0]
 
     def readInt32(self) -> int:
-        return self._read('i')
+        return self._unpack(INT32)[0]
 
     def readUInt64(self) -> int:
-        return self._read('Q')
+        return self._unpack(UINT64)[0]
 
     def readInt64(self) -> int:
-        return self._read('q')
+        return self._unpack(INT64)[0]
 
     def readFloat(self) -> float:
-        return self._read('f')
+        return self._unpack(FLOAT)[0]
 
     def readDouble(self) -> float:
-        return self._read('d')
+        return self._unpack(DOUBLE)[0]
+
+    def readUInt32Array(self, count: int) -> Tuple[int, ...]:
+        return self._unpack(get_struct('I', count))
+
+    def readInt32Array(self, count: int) -> Tuple[int, ...]:
+        return self._unpack(get_struct('i', count))
+
+    def readFloatArray(self, count: int) -> Tuple[float, ...]:
+        return self._unpack(get_struct('f', count))
+
+    def readStructs(self, fmt: str, count: int) -> List[Tuple[Any, ...]]:
+        '''Read `count` consecutive little-endian structs of the given format, returning a tuple for each.'''
+        item = get_struct(fmt)
+        size = item.size * count
+        if self.offset + size > self.end:
+            raise EOFError("End of stream at offset " + str(self.offset))
+
+        values = list(item.iter_unpack(self.mem[self.offset:self.offset + size]))
+        self.offset += size
+        return values
 
     def readBytes(self, count: int) -> bytes:
         if self.offset + count > self.end:
@@ -79,16 +120,18 @@ class MemoryStream:
         value = bytes(raw_bytes[:-2]).decode('utf-16-le')
         return value
 
-    def _read(self, fmt, count: int = None):
-        size = struct.calcsize(fmt)
-        if self.offset + size > self.end:
-            raise EOFError("End of stream at offset " + str(self.offset))
+    def _unpack(self, compiled: struct.Struct) -> Tuple[Any, ...]:
+        offset = self.offset
+        end = offset + compiled.size
+        if end > self.end:
+            raise EOFError("End of stream at offset " + str(offset))
 
+        values = compiled.unpack_from(self.mem, offset)
+        self.offset = end
+        return values
+
+    def _read(self, fmt, count: int = None):
         if count is None or count == 1:
-            value, = struct.unpack_from('<' + fmt, self.mem, self.offset)
-            self.offset += size
-            return value
+            return self._unpack(get_struct(fmt))[0]
 
-        values = struct.unpack_from('<' + str(count) + fmt, self.mem, self.offset)
-        self.offset += size
-        return values
+        return self._unpack(get_struct(fmt, count))
@@ -0,0 +1,168 @@
+'''
+Lightweight asset reader that extracts only what is needed to place an asset's classes in the hierarchy.
+
+Only the package summary, name table, import table and export table are read, and they are kept as plain
+strings and integers rather than building the full UEBase object tree. The results mirror those of a fully
+parsed asset passed through `ue.hierarchy._find_exports_to_store` and `ue.hierarchy._get_parent_cls`.
+'''
+
+from typing import Iterator, List, Optional, Tuple
+
+from utils.log import get_logger
+
+from .consts import BLUEPRINT_GENERATED_CLASS_CLS
+from .stream import MemoryStream
+
+__all__ = [
+    'AssetSummary',
+    'read_asset_summary',
+]
+
+logger = get_logger(__name__)
+
+# package, package instance, klass, klass instance, namespace, name, name instance
+IMPORT_FORMAT = 'IIIIiII'
+
+# klass, super, namespace, name, name instance, remaining fields up to and including the GUID
+EXPORT_FORMAT = 'iiiII' + 'I' + 'II' + 'III' + '16s' + 'II'
+EXPORT_FORMAT_405 = 'iiiII' + 'I' + 'QQ' + 'III' + '16s' + 'II'  # AQUATICA
+
+MAP_CLASSES_TO_STORE = ('/Script/Engine.World', '/Script/Engine.LevelScriptActor')
+
+
+class AssetSummary:
+    '''The minimal name, import and export data of an asset, read without parsing any properties.'''
+
+    def __init__(self, assetname: str, file_ext: Optional[str], names: List[str], imports: List[Tuple[int, ...]],
+                 exports: List[Tuple[int, ...]]):
+        self.assetname = assetname
+        self.file_ext = file_ext
+        self.names = names
+        self.imports = imports
+        self.exports = exports
+
+    def get_name(self, index: int, instance: int = 0) -> str:
+        '''Get a name for the given index, formatted as `NameIndex` would.'''
+        try:
+            name = self.names[index & 0xFFFFF]
+        except IndexError as err:
+            raise IndexError(f'Invalid name index 0x{index:08X} ({index})') from err
+
+        if instance:
+            return f'{name}_{instance - 1}'
+        return name
+
+    def get_export_name(self, export_index: int) -> str:
+        export = self.exports[export_index]
+        return self.get_name(export[3], export[4])
+
+    def get_object_fullname(self, index: int) -> Optional[str]:
+        '''Get the fullname of the import (negative index) or export (positive index) referenced by `index`.'''
+        if index < 0:
+            _, _, _, _, namespace, name, instance = self.imports[-index - 1]
+            if namespace:
+                return self._get_object_leafname(namespace) + '.' + self.get_name(name, instance)
+            return self.get_name(name, instance)
+
+        if index > 0:
+            return self.assetname + '.' + self.get_export_name(index - 1)
+
+        return None
+
+    def find_default_class(self) -> Optional[int]:
+        '''
+        Find the index of the export holding the asset's main class, using the same rules as `AssetLoader`
+        uses to select `default_class` or `default_export`.
+        '''
+        top_exports = [i for i, export in enumerate(self.exports) if export[2] == 0]
+
+        # Look for a BP-style Default__<assetname> export, and use its class
+        defaults = [i for i in top_exports if self.get_export_name(i).startswith('Default__')]
+        if len(defaults) > 1:
+            logger.warning(f'Found more than one Default__ entry in {self.assetname}!')
+        if defaults:
+            klass = self.exports[defaults[0]][0]
+            if klass > 0:
+                return klass - 1
+            if klass < 0:
+                logger.warning(f'Default export of {self.assetname} has an imported class')
+                return None
+            return defaults[0]
+
+        # Fall back to an export named the same as the asset with no namespace
+        leafname = self.assetname.split('/')[-1].lower()
+        matches = [i for i in top_exports if self.get_export_name(i).lower() == leafname]
+        if len(matches) == 1:
+            return matches[0]
+
+        return None
+
+    def iterate_class_relations(self) -> Iterator[Tuple[str, Optional[str]]]:
+        '''
+        Yield (fullname, parent fullname) for each class in the asset that belongs in the hierarchy.
+        Mirrors `_find_exports_to_store` and `_get_parent_cls` from `ue.hierarchy`.
+        '''
+        default_class = self.find_default_class()
+        if default_class is not None:
+            yield self._get_export_relation(default_class)
+
+        if self.file_ext == '.umap':
+            for i, export in enumerate(self.exports):
+                if export[0] and self.get_object_fullname(export[0]) in MAP_CLASSES_TO_STORE:
+                    yield self._get_export_relation(i)
+
+    def _get_export_relation(self, export_index: int) -> Tuple[str, Optional[str]]:
+        klass, super_, *_ = self.exports[export_index]
+        fullname = self.assetname + '.' + self.get_export_name(export_index)
+
+        parent = self.get_object_fullname(klass)
+        if parent == BLUEPRINT_GENERATED_CLASS_CLS:
+            parent = self.get_object_fullname(super_)
+
+        return (fullname, parent)
+
+    def _get_object_leafname(self, index: int) -> str:
+        if index < 0:
+            _, _, _, _, _, name, instance = self.imports[-index - 1]
+            return self.get_name(name, instance)
+        return self.get_export_name(index - 1)
+
+
+def read_asset_summary(mem: memoryview, assetname: str, file_ext: Optional[str] = None) -> AssetSummary:
+    '''Read the summary of an asset from memory. Only the header and the name/import/export tables are touched.'''
+    stream = MemoryStream(mem, 0, len(mem))
+
+    # Header top
+    stream.readUInt32()  # tag
+    stream.readInt32()  # legacy_ver
+    ue_ver = stream.readInt32()
+    stream.readUInt32Array(2)  # file_ver, licensee_ver
+    for _ in range(stream.readUInt32()):
+        # Custom versions
+        stream.readBytes(16)
+        stream.readUInt32()
+        _read_string(stream)
+    stream.readUInt32()  # header_size
+    _read_string(stream)  # package_group
+    stream.readUInt32()  # package_flags
+
+    # Chunk offsets
+    names_count, names_offset, exports_count, exports_offset, imports_count, imports_offset = stream.readUInt32Array(6)
+
+    stream.offset = names_offset
+    names = [_read_string(stream) for _ in range(names_count)]
+
+    stream.offset = imports_offset
+    imports = stream.readStructs(IMPORT_FORMAT, imports_count)
+
+    stream.offset = exports_offset
+    exports = stream.readStructs(EXPORT_FORMAT_405 if ue_ver >= 405 else EXPORT_FORMAT, exports_count)
+
+    return AssetSummary(assetname, file_ext, names, imports, exports)
+
+
+def _read_string(stream: MemoryStream) -> str:
+    size = stream.readInt32()
+    if size >= 0:
+        return stream.readTerminatedString(size)
+    return stream.readTerminatedWideString(-size)
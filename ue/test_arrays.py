@@ -0,0 +1,41 @@
+import struct
+
+from .properties import ArrayProperty, DummyAsset, FloatProperty, PackedArrayValues, Vector
+from .stream import MemoryStream
+from .utils import sanitise_output
+
+
+def make_array(type_name: str, width: int, *values: float) -> ArrayProperty:
+    asset = DummyAsset()
+    payload = struct.pack(f'<I{len(values)}f', len(values) // width, *values)
+    data = struct.pack('<II', asset.addFakeName(type_name), 0) + payload
+    array = ArrayProperty(asset, MemoryStream(data))
+    array.deserialise(len(payload))
+    array.link()
+    return array
+
+
+def test_packed_float_array():
+    array = make_array('FloatProperty', 1, 1.5, 0.1, -2)
+    assert isinstance(array.values, PackedArrayValues)
+    assert array.count == 3
+    assert len(array.values) == 3
+    assert sanitise_output(array) == [1.5, 0.1, -2]
+
+    item = array.values[1]
+    assert isinstance(item, FloatProperty)
+    assert item.is_inside_array
+    assert item.textual == '0.1 (inexact)'
+    assert array.values[1] is item
+    assert array.values[-1] == -2
+    assert [float(value) for value in array.values[:2]] == [1.5, 0.1]
+
+
+def test_packed_vector_array():
+    array = make_array('Vector', 3, 1, 2, 3, 4, 5, 6.5)
+    assert len(array.values) == 2
+    assert sanitise_output(array) == [dict(x=1, y=2, z=3), dict(x=4, y=5, z=6.5)]
+
+    vector = list(array)[1]
+    assert isinstance(vector, Vector)
+    assert vector.z == 6.5
@@ -0,0 +1,26 @@
+import pytest
+
+from .properties import FloatProperty, IntProperty, UInt32Property
+
+
+def test_slotted_fields():
+    prop = IntProperty.create(5)
+    assert not hasattr(prop, '__dict__')
+    assert prop.value == 5
+    assert prop.field_values == dict(value=5)
+    assert prop.field_order == ['value']
+    assert str(prop) == '(int) 5'
+    with pytest.raises(AttributeError):
+        prop.unknown_field  # pylint: disable=pointless-statement
+
+
+def test_slotted_fields_are_inherited():
+    assert UInt32Property._field_slots == ('value', )
+    assert not hasattr(UInt32Property.create(5), '__dict__')
+
+
+def test_slotted_float_fields():
+    prop = FloatProperty.create(0.1)
+    assert list(prop.field_values) == ['value', 'raw_data', 'rounded', 'rounded_value', 'textual']
+    assert prop.textual == '0.1 (inexact)'
+    assert str(prop) == '0.1 (inexact)'
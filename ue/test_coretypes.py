@@ -0,0 +1,32 @@
+import struct
+
+import pytest
+
+from . import coretypes
+from .coretypes import NameIndex
+from .properties import DummyAsset
+from .stream import MemoryStream
+
+
+def test_name_index_resolves_on_access(monkeypatch):
+    monkeypatch.setattr(coretypes, 'INCLUDE_METADATA', False)
+    asset = DummyAsset()
+    index = asset.addFakeName('Something')
+
+    name = NameIndex(asset, MemoryStream(struct.pack('<II', index, 2))).deserialise()
+    name.link()
+    assert name.field_values == dict(index=index, instance=2)
+
+    assert str(name) == 'Something_1'
+    assert name.field_values['value'] == 'Something_1'
+
+
+@pytest.mark.skipif(not coretypes.INCLUDE_METADATA, reason='names are only resolved on link with metadata')
+def test_name_index_resolves_on_link():
+    asset = DummyAsset()
+    index = asset.addFakeName('Something')
+
+    name = NameIndex(asset, MemoryStream(struct.pack('<II', index, 0))).deserialise()
+    assert 'value' not in name.field_values
+    name.link()
+    assert str(name.field_values['value']) == 'Something'
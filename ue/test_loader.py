@@ -1,10 +1,13 @@
+import mmap
 import os.path
+from pathlib import Path
 
+import pytest
 from pytest import fixture  # type: ignore
 
-from tests.common import MockModResolver
+from tests.common import FakeAsset, MockModResolver, fixture_tempdir  # noqa: F401
 
-from .loader import AssetLoader
+from .loader import AssetLoader, AssetNameFilter, LoaderStats, UsageBasedCacheManager, load_file_into_memory, release_file_memory
 
 
 @fixture
@@ -51,3 +54,193 @@ def test_convert_asset_name_to_path(loader):
     assert convert('Game/One/Two') == f'{base}{s}Content{s}One{s}Two.uasset'
     assert convert('Game/One/Two/') == f'{base}{s}Content{s}One{s}Two.uasset'
     assert convert('/Game/One/Two/') == f'{base}{s}Content{s}One{s}Two.uasset'
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_load_file_into_memory(tempdir: Path, use_mmap: bool):
+    filename = tempdir / 'data.bin'
+    filename.write_bytes(bytes(range(256)))
+
+    mem = load_file_into_memory(filename, use_mmap=use_mmap)
+    assert len(mem) == 256
+    assert mem[0] == 0 and mem[255] == 255
+    assert bytes(mem[16:20]) == bytes((16, 17, 18, 19))
+
+    source = mem.obj
+    release_file_memory(mem)
+    if use_mmap:
+        assert isinstance(source, mmap.mmap) and source.closed
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_load_empty_file_into_memory(tempdir: Path, use_mmap: bool):
+    filename = tempdir / 'empty.bin'
+    filename.write_bytes(b'')
+
+    mem = load_file_into_memory(filename, use_mmap=use_mmap)
+    assert len(mem) == 0
+    release_file_memory(mem)
+
+
+def test_cache_purges_by_estimated_size():
+    cache = UsageBasedCacheManager(max_memory=1000)
+    cache.add('/Game/A', FakeAsset(400))
+    cache.add('/Game/B', FakeAsset(400))
+    assert cache.lookup('/Game/A')  # mark as recently used
+    cache.add('/Game/C', FakeAsset(400))
+
+    assert cache.get_count() == 2
+    assert cache.lookup('/Game/B') is None
+    assert cache.total_size == 800
+
+    # Assets growing after being cached are accounted for on lookup
+    asset = cache.lookup('/Game/C')
+    asset.estimated_size = 900
+    cache.lookup('/Game/C')
+    assert cache.total_size == 1300
+    cache.add('/Game/D', FakeAsset(100))
+    assert list(cache.cache) == ['/Game/C', '/Game/D']
+    assert cache.total_size == 1000
+
+    # The newest asset is kept even if it is over budget on its own
+    cache.add('/Game/E', FakeAsset(5000))
+    assert set(cache.cache) == {'/Game/E'}
+
+    cache.remove('/Game/E')
+    assert cache.get_count() == 0 and cache.total_size == 0
+
+
+def test_loader_stats_samples_memory_periodically():
+    stats = LoaderStats(memory_sample_interval=3600)
+    stats.record_load(False, 1)
+    first_sample = stats.next_memory_sample
+    assert stats.max_memory > 0
+
+    stats.record_load(True, 3)
+    stats.record_load(True, 2)
+    assert stats.next_memory_sample == first_sample
+    assert (stats.loads, stats.cache_hits, stats.cache_misses, stats.max_cache) == (3, 2, 1, 3)
+
+    stats.record_parse(100, 0.5)
+    stats.record_parse(50, 0.25, upgrade=True)
+    assert (stats.assets_parsed, stats.assets_upgraded, stats.bytes_read, stats.parse_time) == (1, 1, 150, 0.75)
+
+
+def test_asset_name_filter():
+    name_filter = AssetNameFilter(['/Game/Mods/Keep/.*'], ['/Game/Mods/.*', '.*/Textures/', '/Game/Maps/Menu$'])
+    assert name_filter.matches('/Game/PrimalEarth/Dino')
+    assert name_filter.matches('/Game/Mods/Keep/Dino')
+    assert not name_filter.matches('/Game/Mods/Other/Dino')
+    assert not name_filter.matches('/Game/Dinos/Textures/T_Rex')
+    assert not name_filter.matches('/Game/Maps/Menu')
+    assert name_filter.matches('/Game/Maps/MenuExtra')
+
+    # Whole directories are only excluded when no forced inclusion could be within them
+    assert name_filter.excludes_all_within('/Game/Mods/Other/')
+    assert name_filter.excludes_all_within('/Game/Dinos/Textures/')
+    assert not name_filter.excludes_all_within('/Game/Mods/')
+    assert not name_filter.excludes_all_within('/Game/Mods/Keep/Sub/')
+    assert not name_filter.excludes_all_within('/Game/Maps/')
+    assert not name_filter.excludes_all_within(None)
+
+    # An inclusion with no fixed prefix could match anywhere
+    assert not AssetNameFilter(['.*/Keep/.*'], ['/Game/Mods/.*']).excludes_all_within('/Game/Mods/Other/')
+
+
+def test_prefetch_reads_ahead_in_order(tempdir: Path):
+    content = tempdir / 'Content'
+    content.mkdir()
+    for i in range(5):
+        (content / f'Asset{i}.uasset').write_bytes(bytes([i]) * 10)
+
+    loader = AssetLoader(modresolver=MockModResolver(), assetpath=tempdir, prefetch_count=2)
+    prefetcher = loader.prefetcher
+    assert prefetcher
+
+    queue = loader.prefetch(f'/Game/Asset{i}' for i in range(5))
+    assert queue
+    assert list(queue.pending) == ['/Game/Asset0', '/Game/Asset1']
+
+    mem = prefetcher.take('/Game/Asset0')
+    assert mem is not None and bytes(mem) == bytes([0]) * 10
+    assert list(queue.pending) == ['/Game/Asset1', '/Game/Asset2']
+
+    # Assets loaded out of order don't disturb the data read for those before them
+    assert prefetcher.take('/Game/Asset2') is not None
+    assert list(queue.pending) == ['/Game/Asset1', '/Game/Asset3']
+    assert prefetcher.take('/Game/Missing') is None
+
+    # ...which is only dropped once the caller is done with those assets without using it
+    loader.release_prefetch(queue, 'Game/Asset1')
+    assert list(queue.pending) == ['/Game/Asset3', '/Game/Asset4']
+    loader.release_prefetch(queue, '/Game/Asset2')
+    assert list(queue.pending) == ['/Game/Asset3', '/Game/Asset4']
+
+    loader.cancel_prefetch(queue)
+    assert not queue.pending and not queue.names and not prefetcher.queues
+
+
+def test_nested_prefetch_queues(tempdir: Path):
+    content = tempdir / 'Content'
+    content.mkdir()
+    for i in range(6):
+        (content / f'Asset{i}.uasset').write_bytes(bytes([i]) * 10)
+
+    loader = AssetLoader(modresolver=MockModResolver(), assetpath=tempdir, prefetch_count=2)
+    prefetcher = loader.prefetcher
+    assert prefetcher
+
+    # Names are normalised before they are checked against the cache and pending reads
+    loader.cache.add('/Game/Asset3', FakeAsset(10))  # type: ignore
+    outer = loader.prefetch(['Game/Asset3', 'Game/Asset0/', '/Game/Asset1', '/Game/Asset2'])
+    assert outer
+    assert list(outer.pending) == ['/Game/Asset0', '/Game/Asset1']
+
+    # A nested queue is served first, without disturbing the outer one
+    inner = loader.prefetch(['/Game/Asset4', '/Game/Asset5'])
+    assert inner
+    assert prefetcher.take('/Game/Asset1') is not None
+    assert list(outer.pending) == ['/Game/Asset0']
+    assert list(inner.pending) == ['/Game/Asset4']
+
+    # Cancelling the nested queue leaves the outer one to carry on
+    loader.cancel_prefetch(inner)
+    assert prefetcher.queues == [outer]
+    assert list(outer.pending) == ['/Game/Asset0', '/Game/Asset2']
+    assert prefetcher.take('/Game/Asset0') is not None
+
+    loader.cancel_prefetch(outer)
+    assert not prefetcher.queues
+
+
+def test_parse_service_keeps_workers_until_closed(tempdir: Path):
+    content = tempdir / 'Content'
+    content.mkdir()
+    (content / 'Asset0.uasset').write_bytes(b'not an asset')
+    (content / 'Asset1.uasset').write_bytes(b'not an asset')
+
+    loader = AssetLoader(modresolver=MockModResolver(), assetpath=tempdir, parse_processes=1)
+    service = loader.parse_service
+    assert service
+
+    try:
+        queue = loader.prefetch(['/Game/Asset0'])
+        executor = service.executor
+        assert executor
+        assert service.take('/Game/Asset0') is None  # failed in the worker, so left for a normal load to report
+        processes = list(executor._processes.values())  # type: ignore  # pylint: disable=protected-access
+        assert processes
+
+        # Cancelling only drops the queued work, leaving the workers for the next queue
+        loader.cancel_prefetch(queue)
+        assert not service.queues
+        assert service.executor is executor
+        queue = loader.prefetch(['/Game/Asset1'])
+        assert service.executor is executor
+        assert service.take('/Game/Asset1') is None
+        loader.cancel_prefetch(queue)
+    finally:
+        loader.close()
+
+    assert service.executor is None
+    assert not any(process.is_alive() for process in processes)
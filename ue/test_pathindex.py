@@ -0,0 +1,57 @@
+from pathlib import Path
+
+from tests.common import fixture_tempdir  # noqa: F401
+
+from .pathindex import PathIndex
+
+
+def make_tree(base: Path):
+    (base / 'Content' / 'Mods' / 'Sub').mkdir(parents=True)
+    (base / 'Content' / 'Top.uasset').write_bytes(b'')
+    (base / 'Content' / 'Mods' / 'Sub' / 'Asset.uasset').write_bytes(b'')
+    (base / 'Content' / 'Mods' / 'Sub' / 'Map.umap').write_bytes(b'')
+
+
+def test_find_case_insensitive(tempdir: Path):
+    make_tree(tempdir)
+    index = PathIndex(tempdir)
+
+    assert index.find('Content', 'Top.uasset') == tempdir / 'Content' / 'Top.uasset'
+    assert index.find('content', 'mods', 'SUB', 'asset.uasset') == tempdir / 'Content' / 'Mods' / 'Sub' / 'Asset.uasset'
+    assert index.find('Content', 'Mods', is_dir=True) == tempdir / 'Content' / 'Mods'
+    assert index.find('Content', 'Mods', is_dir=False) is None
+    assert index.find('Content', 'Top.uasset', 'Extra') is None
+    assert index.find('Content', 'Missing.uasset') is None
+    assert index.find('', 'Content', is_dir=True) == tempdir / 'Content'
+
+
+def test_misses_are_remembered_until_cleared(tempdir: Path):
+    make_tree(tempdir)
+    index = PathIndex(tempdir)
+    assert index.find('Content', 'New.uasset') is None
+
+    (tempdir / 'Content' / 'New.uasset').write_bytes(b'')
+    assert index.find('Content', 'New.uasset') is None
+
+    index.clear()
+    assert index.find('Content', 'new.uasset') == tempdir / 'Content' / 'New.uasset'
+
+
+def test_walk(tempdir: Path):
+    make_tree(tempdir)
+    index = PathIndex(tempdir)
+
+    results = {path: sorted(files) for path, _, files in index.walk('content')}
+    assert results == {
+        'Content': ['Top.uasset'],
+        'Content/Mods': [],
+        'Content/Mods/Sub': ['Asset.uasset', 'Map.umap'],
+    }
+    assert list(index.walk('Content', 'Missing')) == []
+
+    # Directories removed from the listing are skipped
+    walked = []
+    for path, dirnames, _ in index.walk('Content'):
+        walked.append(path)
+        dirnames.clear()
+    assert walked == ['Content']
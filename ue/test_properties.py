@@ -0,0 +1,109 @@
+import math
+import struct
+
+import pytest
+
+from .asset import ExportTableItem
+from .coretypes import NameIndex
+from .properties import DummyAsset, IntProperty, PropertyTable, decode_type_or_name
+from .stream import MemoryStream
+
+
+def decode(asset: DummyAsset, index: int):
+    return decode_type_or_name(NameIndex(asset, MemoryStream(struct.pack('<II', index, 0))))
+
+
+def test_decode_type_or_name():
+    asset = DummyAsset()
+    int_type = asset.addFakeName('IntProperty')
+    skippable = asset.addFakeName('Vector4')
+    unskippable = asset.addFakeName('Transform')
+    plain = asset.addFakeName('Something')
+
+    assert decode(asset, int_type) == ('IntProperty', IntProperty, None)
+    assert decode(asset, skippable) == ('Vector4', None, 16)
+    name, property_type, skip_length = decode(asset, unskippable)
+    assert (name, property_type) == ('Transform', None) and math.isnan(skip_length)
+    assert decode(asset, plain) == ('Something', None, None)
+    assert decode(asset, asset.none_index) == (None, None, None)
+
+
+def test_decode_type_or_name_is_remembered():
+    asset = DummyAsset()
+    int_type = asset.addFakeName('IntProperty')
+
+    result = decode(asset, int_type)
+    assert asset.decoded_type_names == {(int_type, 0): result}
+    assert decode(asset, int_type) is result
+
+
+def make_table_data(asset: DummyAsset, *props) -> bytes:
+    int_type = asset.addFakeName('IntProperty')
+    data = b''
+    for name, index, value in props:
+        data += struct.pack('<IIIIIIi', asset.addFakeName(name), 0, int_type, 0, 4, index, value)
+    data += struct.pack('<II', asset.none_index, 0)
+    return data
+
+
+def make_table(asset: DummyAsset, *props) -> PropertyTable:
+    data = make_table_data(asset, *props)
+    table = PropertyTable(asset, MemoryStream(data))
+    table.deserialise()
+    table.link()
+    return table
+
+
+def test_property_table_dict():
+    table = make_table(DummyAsset(), ('A', 0, 1), ('B', 0, 2), ('B', 1, 3))
+
+    values = {name: {index: value.value for index, value in values.items()} for name, values in table.as_dict().items()}
+    assert values == dict(A={0: 1}, B={0: 2, 1: 3})
+    assert table.get_property('B', 1).value == 3
+    assert table.get_property('C', fallback=None) is None
+    assert table.get_property('B', 2, fallback=None) is None
+    with pytest.raises(KeyError):
+        table.get_property('C')
+    assert 'C' not in table.as_dict()
+
+    formatted = table.format_for_json()
+    assert formatted['A'].value == 1
+    assert list(formatted['B']) == [0, 1]
+
+
+def get_values(table: PropertyTable):
+    return {name: {index: value.value for index, value in values.items()} for name, values in table.as_dict().items()}
+
+
+def test_property_table_skips_unwanted():
+    asset = DummyAsset()
+    # Exports can have a few bytes after the terminator, too short for a whole property tag
+    data = make_table_data(asset, ('Health', 0, 100), ('Speed', 0, 5), ('Health', 1, 200)) + bytes(4)
+
+    def parse(wanted):
+        table = PropertyTable(asset, MemoryStream(data)).deserialise(wanted)
+        table.link()
+        return table
+
+    assert get_values(parse(None)) == dict(Health={0: 100, 1: 200}, Speed={0: 5})
+    assert get_values(parse({'Health'})) == dict(Health={0: 100, 1: 200})
+    assert get_values(parse({'Speed'})) == dict(Speed={0: 5})
+    assert get_values(parse(set())) == dict()
+
+
+def test_lazy_export_partial_properties():
+    asset = DummyAsset(lazy_properties=True, has_properties=True)
+    data = make_table_data(asset, ('Health', 0, 100), ('Speed', 0, 5)) + bytes(4)
+    export = ExportTableItem(asset, MemoryStream(data))
+    export._newField('serial_offset', 0)  # pylint: disable=protected-access
+    export._newField('serial_size', len(data))  # pylint: disable=protected-access
+
+    # Partial tables are remembered but never stored as the export's properties
+    partial = export.get_properties({'Speed'})
+    assert get_values(partial) == dict(Speed={0: 5})
+    assert export.get_properties({'Speed'}) is partial
+    assert 'properties' not in export.field_values
+
+    # The full table is still parsed on request, and then used for every request
+    assert get_values(export.properties) == dict(Health={0: 100}, Speed={0: 5})
+    assert export.get_properties({'Speed'}) is export.properties
@@ -103,3 +103,18 @@ def test_unspecified_fields(simple_proxy):
 
     assert simple_proxy.has_override('OtherField', 0) is True
     assert simple_proxy.has_override('IntField', 1) is False
+
+
+def test_field_names_include_annotations():
+
+    class Proxy1(UEProxyStructure, uetype="DummyType1"):
+        IntField = ueints(1)
+        TypedField: Mapping[int, float]
+        _private: int
+
+    class SubProxy1(Proxy1, uetype="DummyType2"):
+        SubField = ueints(2)
+        SubTypedField: Mapping[int, float]
+
+    assert Proxy1.get_field_names() == {'IntField', 'TypedField'}
+    assert SubProxy1.get_field_names() == {'IntField', 'TypedField', 'SubField', 'SubTypedField'}
@@ -0,0 +1,52 @@
+import struct
+
+import pytest
+
+from .stream import MemoryStream
+
+
+def test_read_primitives():
+    data = struct.pack('<bBhHiIqQfd', -1, 255, -2, 65535, -3, 4000000000, -4, 2**63, 1.5, 2.25)
+    stream = MemoryStream(data)
+    assert stream.readInt8() == -1
+    assert stream.readUInt8() == 255
+    assert stream.readInt16() == -2
+    assert stream.readUInt16() == 65535
+    assert stream.readInt32() == -3
+    assert stream.readUInt32() == 4000000000
+    assert stream.readInt64() == -4
+    assert stream.readUInt64() == 2**63
+    assert stream.readFloat() == 1.5
+    assert stream.readDouble() == 2.25
+    assert stream.offset == len(data)
+
+
+def test_read_arrays():
+    data = struct.pack('<3I2i2f', 1, 2, 3, -1, -2, 0.5, 0.25)
+    stream = MemoryStream(data)
+    assert stream.readUInt32Array(3) == (1, 2, 3)
+    assert stream.readInt32Array(2) == (-1, -2)
+    assert stream.readFloatArray(2) == (0.5, 0.25)
+    assert stream.offset == len(data)
+
+
+def test_read_structs():
+    data = struct.pack('<fffifffi', 1, 2, 3, 4, 5, 6, 7, 8)
+    stream = MemoryStream(data)
+    assert stream.readStructs('fffi', 2) == [(1.0, 2.0, 3.0, 4), (5.0, 6.0, 7.0, 8)]
+    assert stream.offset == len(data)
+
+
+def test_read_respects_stream_end():
+    data = struct.pack('<4I', 1, 2, 3, 4)
+    stream = MemoryStream(MemoryStream(data), 4, 8)
+    assert stream.readUInt32Array(2) == (2, 3)
+    with pytest.raises(EOFError):
+        stream.readUInt32()
+
+    stream.offset = 4
+    with pytest.raises(EOFError):
+        stream.readUInt32Array(3)
+    with pytest.raises(EOFError):
+        stream.readStructs('I', 3)
+    assert stream.offset == 4
@@ -190,11 +190,12 @@ def collect_data(asset: UAsset) -> Tuple[str, Any]:
                 param_name = sanitise_output(param_info['ParameterName'])
                 parameters[param_name] = param_info['ParameterValue']
 
+        parent = mat_properties.get('Parent', {}).get(0, None)
         if parameters:
-            data['2DMaterial'] = dict(Parent=mat_properties['Parent'][0], **parameters)
+            data['2DMaterial'] = dict(Parent=parent, **parameters)
         else:
             # Export only the parent material as the instance has no parameters.
-            data['2DMaterial'] = mat_properties['Parent'][0]
+            data['2DMaterial'] = parent
 
         data = sanitise_output(data)
         filename = create_filename(export.fullname)
@@ -6,7 +6,7 @@ import hashlib
 import json
 import pickle
 from pathlib import Path
-from typing import Callable, TypeVar, Union
+from typing import Any, Callable, Optional, TypeVar, Union
 
 from utils.log import get_logger
 
@@ -38,19 +38,36 @@ def cache_data(key: TKey,
         key = { 'version': 1, 'lastModified': 34785643526 }
         data = cached_data(key, 'filename', generate_the_data)
     '''
+    if not force_regenerate:
+        data = load_cached_data(key, filename)
+        if data is not None:
+            return data
+
+    # Generate new data, hash it, and save it for future use
+    logger.debug('Triggering data generation')
+    data = generator_fn(key)
+    save_cached_data(key, filename, data, pickle_protocol=pickle_protocol)
+
+    return data
+
+
+def load_cached_data(key: TKey, filename: Union[str, Path]) -> Optional[Any]:
+    '''
+    Load data previously stored with `save_cached_data`, if it exists and its hash matches that of the given key.
+    Returns None if there is no valid cached data.
+    '''
     basepath: Path = Path(filename)
     data_filename = basepath.with_suffix('.pickle')
     hash_filename = basepath.with_suffix('.hash')
-    key_hash = _hash_from_object(key)
+    key_hash = hash_from_object(key)
 
     # Try to find hash of cached file, if it exists
     existing_hash: str = ''
-    if not force_regenerate:
-        try:
-            with open(hash_filename, 'rt', encoding='utf-8') as f_hash:
-                existing_hash = f_hash.read().strip()
-        except IOError:
-            logger.debug(f'Cached hash file {hash_filename} could not be loaded')
+    try:
+        with open(hash_filename, 'rt', encoding='utf-8') as f_hash:
+            existing_hash = f_hash.read().strip()
+    except IOError:
+        logger.debug(f'Cached hash file {hash_filename} could not be loaded')
 
     # If they match, load and return the cached data
     if key_hash == existing_hash:
@@ -66,9 +83,17 @@ def cache_data(key: TKey,
     else:
         logger.debug('Hash did not match')
 
-    # Generate new data, hash it, and save it for future use
-    logger.debug('Triggering data generation')
-    data = generator_fn(key)
+    return None
+
+
+def save_cached_data(key: TKey, filename: Union[str, Path], data: Any, pickle_protocol=PICKLE_PROTOCOL):
+    '''
+    Save data along with the hash of the given key, for later retrieval with `load_cached_data`.
+    '''
+    basepath: Path = Path(filename)
+    data_filename = basepath.with_suffix('.pickle')
+    hash_filename = basepath.with_suffix('.hash')
+    key_hash = hash_from_object(key)
 
     try:
         with open(hash_filename, 'wt', encoding='utf-8') as f_hash:
@@ -82,10 +107,8 @@ def cache_data(key: TKey,
     except IOError:
         logger.exception(f'Unable to save cached data in {hash_filename}')
 
-    return data
-
 
-def _hash_from_object(key: object) -> str:
+def hash_from_object(key: object) -> str:
     json_string = json.dumps(key, indent=None, separators=(',', ':'))
     as_bytes = json_string.encode('utf8')
     digest = hashlib.sha512(as_bytes).hexdigest()
@@ -2,7 +2,7 @@ from pathlib import Path
 
 from tests.common import fixture_tempdir  # noqa: F401
 
-from .cachefile import cache_data
+from .cachefile import cache_data, load_cached_data, save_cached_data
 
 EXTENSIONS = ('.hash', '.pickle')
 
@@ -77,6 +77,14 @@ def test_cached_data_allow_force_regerenate(tempdir: Path):
     assert calls == 1
 
 
+def test_load_cached_data_checks_key(tempdir: Path):
+    assert load_cached_data(dict(version=1), tempdir / 'data') is None
+
+    save_cached_data(dict(version=1), tempdir / 'data', [1, 2, 3])
+    assert load_cached_data(dict(version=1), tempdir / 'data') == [1, 2, 3]
+    assert load_cached_data(dict(version=2), tempdir / 'data') is None
+
+
 fn_calls = 0
 
 
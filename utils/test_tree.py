@@ -2,7 +2,7 @@ from operator import attrgetter
 
 import pytest
 
-from .tree import IndexedTree, Node
+from .tree import FrozenTree, IndexedTree, Node
 
 
 @pytest.fixture(name='basic_tree')
@@ -151,3 +151,59 @@ def test_insert_segment():
     # Ensure parent chain extends into segment completely
     assert t['naa'].parent is t['na']
     assert t['segment'].parent is t['b']
+
+
+def test_frozen_tree():
+    t = IndexedTree[str]('root')
+    t.add('root', 'a')
+    t.add('root', 'b')
+    t.add('a', 'a1')
+    t.add('b', 'b1')
+    t.add('b1', 'b1x')
+    t.add('b', 'b2')
+
+    frozen = t.frozen()
+    assert len(frozen) == 7
+    assert 'b1x' in frozen
+    assert list(frozen.descendants('root')) == ['a', 'a1', 'b', 'b1', 'b1x', 'b2']
+    assert list(frozen.descendants('b')) == ['b1', 'b1x', 'b2']
+    assert list(frozen.descendants('a1')) == []
+    assert list(frozen.ancestors('b1x')) == ['b1', 'b', 'root']
+    assert frozen.depth('b1x') == 3
+
+    assert frozen.is_descendant('b1x', 'root')
+    assert frozen.is_descendant('b1x', 'b')
+    assert not frozen.is_descendant('b1x', 'a')
+    assert not frozen.is_descendant('b', 'b1x')
+    assert not frozen.is_descendant('b', 'b')
+    assert frozen.is_descendant('b', 'b', include_self=True)
+
+
+def test_frozen_tree_rebuilt_after_changes():
+    t = IndexedTree[str]('root')
+    t.add('root', 'a')
+    frozen = t.frozen()
+    assert t.frozen() is frozen
+
+    t.add('a', 'a1')
+    assert t.frozen() is not frozen
+    assert list(t.frozen().descendants('a')) == ['a1']
+
+    t.clear()
+    assert list(t.frozen().descendants('root')) == []
+
+
+def test_restore_from_frozen_tree():
+    t = IndexedTree[str]('root')
+    t.add('root', 'a')
+    t.add('root', 'b')
+    t.add('a', 'a1')
+
+    copy = IndexedTree[str]('root')
+    copy.add('root', 'old')
+    copy.restore(FrozenTree[str](list(t.frozen().data), list(t.frozen().parents)))
+    assert 'old' not in copy
+    assert list(copy.keys()) == ['root', 'a', 'a1', 'b']
+    assert copy['a1'].parent is copy['a']
+    assert copy['b'].parent is copy.root
+    assert list(copy.frozen().descendants('a')) == ['a1']
@@ -4,7 +4,7 @@ Reusable tree structure, including a variant with a fast indexed lookup.
 from __future__ import annotations
 
 from collections import deque
-from typing import Callable, Deque, Dict, Generic, Iterable, List, Optional, TypeVar, Union
+from typing import Callable, Deque, Dict, Generic, Iterable, Iterator, List, Optional, Sequence, TypeVar, Union
 
 try:
     from IPython.lib.pretty import PrettyPrinter  # type: ignore
@@ -15,6 +15,7 @@ except ImportError:
 __all__ = [
     'Node',
     'IndexedTree',
+    'FrozenTree',
 ]
 
 T = TypeVar('T')
@@ -106,6 +107,7 @@ class Node(Generic[T]):
 class IndexedTree(Generic[T]):
     _key_fn: Optional[Callable[[T], str]]
     _lookup: Dict[str, Node[T]]
+    _frozen: Optional[FrozenTree[T]]
     root: Node[T]
 
     def __init__(self, root: T, key_fn: Optional[Callable[[T], str]] = None):
@@ -115,9 +117,35 @@ class IndexedTree(Generic[T]):
 
     def clear(self):
         self._lookup = dict()
+        self._frozen = None
         self.root = Node[T](self._root_data)
         self._register(self.root)
 
+    def frozen(self) -> FrozenTree[T]:
+        '''
+        Get an index-based snapshot of the tree for fast queries, building it if the tree has changed.
+        Note that only changes made through this class are tracked, not those made directly to nodes.
+        '''
+        if self._frozen is None:
+            self._frozen = FrozenTree.from_tree(self)
+        return self._frozen
+
+    def restore(self, frozen: FrozenTree[T]):
+        '''Replace the entire contents of the tree with those of a snapshot, in a single pass.'''
+        if frozen.data[0] != self._root_data:
+            raise ValueError('Snapshot has a different root')
+
+        self.clear()
+        nodes: List[Node[T]] = [self.root]
+        for data, parent_index in zip(frozen.data[1:], frozen.parents[1:]):
+            parent = nodes[parent_index]
+            node = Node[T](data, parent)
+            parent._nodes.append(node)  # pylint: disable=protected-access  # it's our own module
+            nodes.append(node)
+            self._register(node)
+
+        self._frozen = frozen
+
     def add(self, parent: Union[str, Node[T]], data: Union[T, Node[T]]) -> Node[T]:
         parent_node = self._handle_parent_arg(parent)
 
@@ -189,6 +217,7 @@ class IndexedTree(Generic[T]):
         if key in self._lookup:
             raise KeyError(f'Key already present: {key}')
         self._lookup[key] = node
+        self._frozen = None
 
     def _handle_parent_arg(self, parent: Union[str, Node[T]]) -> Node[T]:
         parent_node: Node[T]
@@ -210,3 +239,74 @@ class IndexedTree(Generic[T]):
 
             p.text('Tree ')
             p.pretty(self.root)
+
+
+class FrozenTree(Generic[T]):
+    '''
+    An immutable snapshot of an IndexedTree, with nodes numbered in depth-first pre-order.
+
+    Every node's descendants occupy the contiguous range of indices directly after it, so ancestry checks
+    become a range comparison and sub-tree listings a slice.
+    '''
+
+    def __init__(self, data: List[T], parents: Sequence[int], key_fn: Optional[Callable[[T], str]] = None):
+        '''
+        Create from nodes already in pre-order, where `parents` holds the index of each node's parent (-1 for the root).
+        Use `IndexedTree.frozen` to create one from an existing tree.
+        '''
+        self.data: List[T] = data
+        self.parents: Sequence[int] = parents
+        self.key_fn = key_fn
+        keys: Iterable[str] = map(key_fn, data) if key_fn else data  # type: ignore
+        self.index: Dict[str, int] = {key: i for i, key in enumerate(keys)}
+
+        self.depths: List[int] = [0] * len(data)
+        for i in range(1, len(data)):
+            self.depths[i] = self.depths[parents[i]] + 1
+
+        # Accumulate sub-tree sizes bottom-up to find where each node's range ends
+        sizes = [1] * len(data)
+        for i in range(len(data) - 1, 0, -1):
+            sizes[parents[i]] += sizes[i]
+        self.ends: List[int] = [i + size for i, size in enumerate(sizes)]
+
+    @classmethod
+    def from_tree(cls, tree: IndexedTree[T]) -> FrozenTree[T]:
+        data: List[T] = list()
+        parents: List[int] = list()
+        positions: Dict[int, int] = dict()
+        for node in tree.root.walk_iterator(skip_self=False):
+            parents.append(positions[id(node.parent)] if node.parent else -1)
+            positions[id(node)] = len(data)
+            data.append(node.data)
+
+        return cls(data, parents, tree._key_fn)  # pylint: disable=protected-access  # it's our own module
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def is_descendant(self, key: str, ancestor_key: str, include_self=False) -> bool:
+        '''Check if the node `key` is below `ancestor_key`. Both keys must be present.'''
+        i = self.index[key]
+        ancestor = self.index[ancestor_key]
+        if i == ancestor:
+            return include_self
+        return ancestor < i < self.ends[ancestor]
+
+    def descendants(self, key: str) -> Sequence[T]:
+        '''All nodes below `key`, in depth-first order.'''
+        i = self.index[key]
+        return self.data[i + 1:self.ends[i]]
+
+    def ancestors(self, key: str) -> Iterator[T]:
+        '''Step up through the parents of `key`, ending with the root.'''
+        i = self.parents[self.index[key]]
+        while i >= 0:
+            yield self.data[i]
+            i = self.parents[i]
+
+    def depth(self, key: str) -> int:
+        return self.depths[self.index[key]]